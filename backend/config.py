@@ -86,6 +86,9 @@ class Settings:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     WHISPER_MODEL = "tiny"  # Options: tiny, base, small, medium, large
     LLM_MODEL = "gpt-4"
+    # Optional sentence-transformers model for local candidate pre-selection before
+    # LLM ranking (e.g. sentence-transformers/all-MiniLM-L6-v2); unset to disable
+    RANKING_EMBEDDING_MODEL = os.getenv("RANKING_EMBEDDING_MODEL")
     
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -10,8 +10,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 import uvicorn
-import json
+import os
+import orjson
 import aiofiles
 import asyncio
 from pathlib import Path
@@ -37,6 +39,7 @@ logger = get_logger(__name__)
 
 # Application constants
 USER_NOT_FOUND_MESSAGE = "User not found"
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Stream uploads to disk in 1 MiB pieces
 
 # Initialize database tables on startup
 create_tables()
@@ -107,16 +110,53 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     return user
 
-def get_job_dir(job_id: str) -> Path:
+def get_job_dir(job_id: str, create: bool = True) -> Path:
     """
     Get or create the directory for a specific job's files.
     
     Creates a unique directory structure for each job to store all processing files.
+    Read-only endpoints pass create=False: they only look files up, so the
+    mkdir syscall is wasted work (and would create directories for unknown IDs).
     """
     job_dir = Path(f"data/jobs/{job_id}")
-    job_dir.mkdir(parents=True, exist_ok=True)
+    if create:
+        job_dir.mkdir(parents=True, exist_ok=True)
     return job_dir
 
+async def save_upload_file(file: UploadFile, destination: Path) -> None:
+    """
+    Write an uploaded file to disk without holding it in memory.
+    
+    Uploads past the multipart spool threshold are already in a temporary file;
+    on Linux those are copied in-kernel with os.copy_file_range. Small in-memory
+    uploads, other platforms, and cross-filesystem copies the kernel refuses
+    fall back to streaming in UPLOAD_CHUNK_SIZE pieces.
+    """
+    spooled = file.file
+    if hasattr(os, "copy_file_range") and getattr(spooled, "_rolled", False):
+        try:
+            await run_in_threadpool(_copy_file_range, spooled.fileno(), destination)
+            return
+        except OSError as e:
+            logger.debug(f"copy_file_range unavailable for upload, streaming instead: {e}")
+            await file.seek(0)
+    
+    # Copy in fixed-size chunks so peak memory stays flat for large uploads
+    async with aiofiles.open(destination, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await buffer.write(chunk)
+
+def _copy_file_range(src_fd: int, destination: Path) -> None:
+    """Copy the whole of src_fd into destination without a userspace buffer."""
+    size = os.fstat(src_fd).st_size
+    offset = 0
+    with open(destination, "wb") as dst:
+        while offset < size:
+            copied = os.copy_file_range(src_fd, dst.fileno(), size - offset, offset)
+            if copied == 0:
+                break
+            offset += copied
+
 # =============================================================================
 # BACKGROUND PROCESSING
 # =============================================================================
@@ -241,8 +281,12 @@ async def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
     - **access_token**: JWT token for authentication
     - **token_type**: Token type (always "bearer")
     """
-    user = UserService.authenticate_user(db, login_data.email, login_data.password)
-    if not user:
+    # The lookup stays on this thread - the SQLite engine shares one connection.
+    # Only the CPU-bound bcrypt check runs off the event loop, so background
+    # processing and other requests aren't stalled during logins
+    user = UserService.get_user_by_email(db, login_data.email)
+    hashed_password = str(user.hashed_password) if user else None
+    if not await run_in_threadpool(UserService.check_password, login_data.password, hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     access_token = create_access_token(int(user.id), str(user.email))  # type: ignore
@@ -392,9 +436,7 @@ async def upload_video(
         
         # Save uploaded video file to job directory
         input_path = job_dir / "input.mp4"
-        async with aiofiles.open(input_path, "wb") as buffer:
-            content = await file.read()
-            await buffer.write(content)
+        await save_upload_file(file, input_path)
         
         job_id: int = job.id  # type: ignore # Get the actual integer value
         
@@ -452,8 +494,7 @@ async def get_user_jobs(
         q=q,
         status=status
     )
-    jobs = JobService.get_user_jobs(db, current_user.id, query_params)
-    return [JobService.get_job_with_urls(db, job.id) for job in jobs]  # type: ignore
+    return JobService.get_user_jobs_with_urls(db, current_user.id, query_params)
 
 @app.put("/jobs/{job_id}", response_model=JobResponse)
 async def update_job(
@@ -528,14 +569,14 @@ async def get_result(job_id: int, current_user = Depends(get_current_user), db:
         }
     
     # Load jump_to.json if it exists
-    job_dir = get_job_dir(str(job_id))
+    job_dir = get_job_dir(str(job_id), create=False)
     jump_to_file = job_dir / "jump_to.json"
     jump_to = {}
     
     if jump_to_file.exists():
-        async with aiofiles.open(jump_to_file, "r") as f:
+        async with aiofiles.open(jump_to_file, "rb") as f:
             content = await f.read()
-            jump_to = json.loads(content)
+            jump_to = orjson.loads(content)
     
     return {
         "status": "done",
@@ -548,7 +589,7 @@ async def get_result(job_id: int, current_user = Depends(get_current_user), db:
 @app.get("/files/{job_id}/highlights.mp4")
 async def serve_highlights_video(job_id: int):
     """Serve the highlights video file."""
-    job_dir = get_job_dir(str(job_id))
+    job_dir = get_job_dir(str(job_id), create=False)
     video_path = job_dir / "highlights.mp4"
     
     if not video_path.exists():
@@ -563,7 +604,7 @@ async def serve_highlights_video(job_id: int):
 @app.get("/files/{job_id}/thumb.jpg")
 async def serve_thumbnail(job_id: int):
     """Serve the thumbnail image."""
-    job_dir = get_job_dir(str(job_id))
+    job_dir = get_job_dir(str(job_id), create=False)
     thumb_path = job_dir / "thumb.jpg"
     
     if not thumb_path.exists():
@@ -578,7 +619,7 @@ async def serve_thumbnail(job_id: int):
 @app.get("/files/{job_id}/transcript.srt")
 async def serve_transcript(job_id: int):
     """Serve the transcript SRT file."""
-    job_dir = get_job_dir(str(job_id))
+    job_dir = get_job_dir(str(job_id), create=False)
     srt_path = job_dir / "transcript.srt"
     
     if not srt_path.exists():
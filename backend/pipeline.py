@@ -13,19 +13,23 @@ high-quality video summarization.
 """
 
 import asyncio
-import json
+import bisect
+from operator import itemgetter, sub
 import aiofiles
+import orjson
 import time
+import numpy as np
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from backend.transcribe import TranscriptionService
+from backend.transcribe import TranscriptionService, SAMPLE_RATE
 from backend.ranker_llm import LLMRanker
-from backend.render import VideoRenderer
+from backend.render import VideoRenderer, detect_video_encoder, detect_soxr_resampler
 from backend.services import JobService
 from backend.schemas import JobStatus
 from backend.logging_config import get_logger
+from backend.config import settings
 
 logger = get_logger(__name__)
 
@@ -48,6 +52,9 @@ class VideoSummarizerPipeline:
     JUMP_TO_FILE = "jump_to.json"      # Navigation data for timestamp mapping
     THUMBNAIL_FILE = "thumb.jpg"       # Video thumbnail image
     
+    # Maximum number of transcribed segments buffered ahead of GPT ranking
+    SEGMENT_QUEUE_SIZE = 64
+    
     def __init__(self, job_id: int, db_session):
         """
         Initialize the pipeline with job context and database session.
@@ -58,11 +65,12 @@ class VideoSummarizerPipeline:
         """
         self.job_id = job_id
         self.db_session = db_session
+        self.job_dir = Path("data/jobs") / str(job_id)
         self.start_time = time.time()
         
         # Initialize AI services
         self.transcriber = TranscriptionService()
-        self.llm_ranker = LLMRanker()
+        self.llm_ranker = LLMRanker(embedding_model=settings.RANKING_EMBEDDING_MODEL)
         self.renderer = VideoRenderer()
         
         # Processing metrics
@@ -95,49 +103,61 @@ class VideoSummarizerPipeline:
             logger.info(f"Target duration: {target_seconds} seconds")
             
             # Ensure job directory exists for file storage and organization
-            job_dir = Path(f"data/jobs/{self.job_id}")
-            job_dir.mkdir(parents=True, exist_ok=True)
+            self.job_dir.mkdir(parents=True, exist_ok=True)
             
-            input_video = job_dir / "input.mp4"
+            input_video = self.job_dir / "input.mp4"
             logger.info(f"Input video: {input_video}")
             
             # Step 1: Extract audio from video for transcription
-            # Whisper AI requires audio input, not video
+            # Whisper AI requires audio input, not video; samples stay in memory
             logger.info("Step 1/7: Extracting audio from video...")
-            audio_path = await self._extract_audio(str(input_video))
-            logger.info(f"Audio extracted successfully: {audio_path}")
+            audio = await self._extract_audio(str(input_video))
+            logger.info(f"Audio extracted successfully: {len(audio) / SAMPLE_RATE:.1f}s")
             
             # Step 2: Transcribe audio using Whisper AI
             # This converts speech to text with precise timestamps
-            logger.info("Step 2/7: Transcribing audio with Whisper AI...")
-            segments = await self._transcribe(audio_path)
-            logger.info(f"AI transcription completed: {len(segments)} segments found")
-            
             # Step 3: Use GPT-4 to select the most important segments
-            # This is where AI intelligence is applied for smart, comprehensive selection
-            logger.info("Step 3/6: GPT-powered final segment selection...")
-            selected_segments = await self._gpt_select_segments(segments, target_seconds)
+            # Segments are streamed from Whisper into GPT through a bounded queue,
+            # so ranking of early transcript windows overlaps with later decoding
+            logger.info("Step 2/7: Transcribing audio with Whisper AI...")
+            logger.info("Step 3/6: GPT-powered final segment selection (streamed from transcription)...")
+            segment_queue: asyncio.Queue = asyncio.Queue(maxsize=self.SEGMENT_QUEUE_SIZE)
+            producer = asyncio.create_task(self._transcribe_stream(audio, segment_queue))
+            consumer = asyncio.create_task(self._gpt_select_segments(segment_queue, target_seconds))
+            try:
+                segment_count, selected_segments = await asyncio.gather(producer, consumer)
+            except BaseException:
+                # A failure on either side cancels the other, so ranking requests
+                # don't keep running for a failed job and transcription doesn't
+                # block on a queue nobody reads anymore
+                producer.cancel()
+                consumer.cancel()
+                raise
+            logger.info(f"AI transcription completed: {segment_count} segments found")
             logger.info(f"GPT selection completed: {len(selected_segments)} segments selected")
             
             # Step 4: Create the highlight video by cutting and joining segments
             # Uses FFmpeg to create the final output video with proper timing
-            logger.info("Step 4/6: Creating highlights video...")
-            highlights_path = await self._export_highlights(str(input_video), selected_segments)
+            # jump_to.json and result.json only depend on the selected segments,
+            # so they are written while the video renders
+            logger.info("Step 4/6: Creating highlights video and navigation data...")
+            highlights_path, _, _ = await asyncio.gather(
+                self._export_highlights(str(input_video), selected_segments),
+                self._create_jump_to_json(selected_segments),
+                self._write_result_json(selected_segments, target_seconds)
+            )
             logger.info(f"Highlights video created: {highlights_path}")
             
-            # Step 5: Generate thumbnail and navigation data
+            # Step 5: Generate thumbnail from the rendered highlights
             # Thumbnail provides visual preview, jump_to.json enables timestamp navigation
-            logger.info("Step 5/6: Creating thumbnail and navigation data...")
-            await self._create_jump_to_json(selected_segments, str(self.job_id))
-            await self._create_thumbnail(highlights_path, str(self.job_id))
+            logger.info("Step 5/6: Creating thumbnail...")
+            await self._create_thumbnail(highlights_path)
             logger.info("Thumbnail and navigation data created")
             
             # Step 6: Finalize results and update database
             # Store all file paths and metadata for frontend access
-            logger.info("Step 6/6: Writing final results and updating database...")
-            await self._write_result_json(str(self.job_id), selected_segments, target_seconds)
-            self._update_job_paths(highlights_path, audio_path)
-            self._update_job_status(JobStatus.COMPLETED)
+            logger.info("Step 6/6: Updating database...")
+            self._update_job_paths(highlights_path, JobStatus.COMPLETED)
             logger.info("Final results written and database updated")
             
             # Calculate and log metrics
@@ -153,65 +173,111 @@ class VideoSummarizerPipeline:
             self._update_job_status(JobStatus.FAILED, str(e))
             raise
     
-    async def _extract_audio(self, input_video: str) -> str:
-        """Extract audio from video file."""
+    async def _extract_audio(self, input_video: str) -> np.ndarray:
+        """Extract audio from video file as 16kHz mono float32 samples."""
         try:
-            job_dir = Path(f"data/jobs/{self.job_id}")
-            audio_path = job_dir / "audio.wav"
-            
             logger.debug("Converting video to 16kHz mono audio...")
             
+            # Decode straight to stdout so Whisper reads the samples from memory
+            # instead of a WAV file written and read back from disk
             cmd = [
                 "ffmpeg",
+                "-threads", "0",  # Let FFmpeg pick the decoder thread count
                 "-i", input_video,
+                "-map", "0:a:0",  # Decode only the first audio stream
                 "-vn",  # No video
+                "-f", "s16le",  # Raw samples, no container
                 "-acodec", "pcm_s16le",  # 16-bit PCM
-                "-ar", "16000",  # 16kHz sample rate
+                "-ar", str(SAMPLE_RATE),  # 16kHz sample rate
                 "-ac", "1",  # Mono
-                "-y",  # Overwrite
-                str(audio_path)
             ]
+            if await detect_soxr_resampler(self.renderer.ffmpeg_path):
+                cmd += ["-af", "aresample=resampler=soxr"]  # Faster SIMD resampling
+            cmd.append("pipe:1")
             
-            await self._run_ffmpeg(cmd)
-            logger.debug(f"Audio file ready: {audio_path}")
-            return str(audio_path)
+            pcm = await self._run_ffmpeg(cmd)
+            audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+            logger.debug(f"Audio samples ready: {len(audio)} samples")
+            return audio
             
         except Exception as e:
             logger.error(f"Audio extraction failed: {str(e)}")
             raise
     
-    async def _transcribe(self, audio_path: str) -> list:
-        """Transcribe audio and return segments."""
+    async def _transcribe_stream(self, audio: np.ndarray, segment_queue: asyncio.Queue) -> int:
+        """Transcribe audio, feeding segments into the queue as they are produced."""
+        segment_count = 0
         try:
             logger.debug("Loading Whisper AI model (tiny) for fast processing...")
-            segments = await self.transcriber.transcribe(audio_path, str(self.job_id))
-            logger.debug(f"AI transcription completed: {len(segments)} segments")
-            return segments
+            async for segment in self.transcriber.transcribe_stream(audio, str(self.job_id)):
+                await segment_queue.put(segment)
+                segment_count += 1
+            logger.debug(f"AI transcription completed: {segment_count} segments")
+            
+            # Signal end-of-stream only on success - on failure the caller cancels
+            # the consumer instead of letting it rank a partial transcript
+            await segment_queue.put(None)
+            return segment_count
             
         except Exception as e:
-            logger.error(f"Transcription failed: {str(e)}")
             logger.error(f"Transcription failed: {str(e)}")
             raise
     
-    async def _gpt_select_segments(self, segments: list, target_seconds: int) -> List[Dict[str, Any]]:
-        """Let GPT do everything - select final segments directly."""
+    async def _gpt_select_segments(self, segment_queue: asyncio.Queue, target_seconds: int) -> List[Dict[str, Any]]:
+        """Let GPT do everything - select final segments directly from streamed transcript windows."""
+        ranking_tasks: List[asyncio.Task] = []
         try:
-            logger.debug(f"Converting {len(segments)} segments for GPT analysis...")
+            # Accumulate segments into ranker-sized windows and dispatch each window
+            # as soon as it is full, while transcription keeps producing segments
+            window: List[Dict[str, Any]] = []
+            window_counts: List[int] = []
+            window_tokens = 0
+            start_time = time.time()
             
-            # Convert segments to dict format
-            transcript_segments = [
-                {"start": seg.start, "end": seg.end, "text": seg.text}
-                for seg in segments
-            ]
+            # Embedding pre-selection takes a global top-K over the whole transcript,
+            # so with it enabled the stream is collected into one window instead
+            stream_windows = not self.llm_ranker.embedding_model
+            
+            while True:
+                segment = await segment_queue.get()
+                if segment is None:
+                    break
+                
+                transcript_segment = {"start": segment.start, "end": segment.end, "text": segment.text}
+                if not stream_windows:
+                    window.append(transcript_segment)
+                    continue
+                
+                segment_tokens = self.llm_ranker.estimate_tokens(transcript_segment)
+                
+                if window and window_tokens + segment_tokens > self.llm_ranker.max_tokens_per_chunk:
+                    logger.debug(f"Sending {len(window)} segments to GPT-4 for segment selection...")
+                    ranking_tasks.append(asyncio.create_task(
+                        self.llm_ranker.rank_segments(window, target_seconds, token_counts=window_counts)
+                    ))
+                    window = []
+                    window_counts = []
+                    window_tokens = 0
+                
+                window.append(transcript_segment)
+                window_counts.append(segment_tokens)
+                window_tokens += segment_tokens
+            
+            if window:
+                logger.debug(f"Sending {len(window)} segments to GPT-4 for segment selection...")
+                ranking_tasks.append(asyncio.create_task(
+                    self.llm_ranker.rank_segments(
+                        window, target_seconds, token_counts=window_counts if stream_windows else None
+                    )
+                ))
             
             # Let GPT do everything - no fallbacks, no complex algorithms
-            logger.debug("Sending transcript to GPT-4 for complete segment selection...")
-            start_time = time.time()
-            highlights_json = await self.llm_ranker.rank_segments(transcript_segments, target_seconds)
+            results = await asyncio.gather(*ranking_tasks)
             self.metrics["processing_time"] += time.time() - start_time
             
-            # Extract final segments from GPT response
-            selected_segments = highlights_json.get("highlights", [])
+            # Merge final segments from all GPT responses
+            selected_segments = [highlight for result in results for highlight in result.get("highlights", [])]
+            selected_segments.sort(key=lambda x: x["score"], reverse=True)
             
             # Validate and enforce duration limits
             selected_segments = self._validate_segments(selected_segments, target_seconds)
@@ -222,6 +288,10 @@ class VideoSummarizerPipeline:
         except Exception as e:
             logger.error(f"GPT selection failed: {str(e)}")
             raise
+        finally:
+            # On failure or cancellation, stop ranking requests still in flight
+            for task in ranking_tasks:
+                task.cancel()
     
     def _validate_segments(self, segments: List[Dict], target_seconds: int) -> List[Dict]:
         """Validate and enforce duration limits on segments."""
@@ -229,7 +299,7 @@ class VideoSummarizerPipeline:
             return segments
         
         # Calculate total duration
-        total_duration = sum(seg.get("end", 0) - seg.get("start", 0) for seg in segments)
+        total_duration = self._calculate_total_duration(segments)
         
         logger.info(f"GPT selected {len(segments)} segments with {total_duration:.1f}s duration (target: {target_seconds}s)")
         
@@ -237,11 +307,11 @@ class VideoSummarizerPipeline:
         if total_duration > target_seconds * 1.5:  # 50% over target
             logger.warning("Duration significantly over target - reducing segments")
             
-            # Sort by score and use a smarter selection algorithm
-            sorted_segments = sorted(segments, key=lambda x: x.get("score", 0), reverse=True)
-            validated_segments = self._smart_segment_selection(sorted_segments, target_seconds)
+            # segments arrive score-sorted from the merge above; the chunk and zone
+            # selectors filter this list in order, so nothing here re-sorts it
+            validated_segments = self._smart_segment_selection(segments, target_seconds)
             
-            final_duration = sum(seg.get("end", 0) - seg.get("start", 0) for seg in validated_segments)
+            final_duration = self._calculate_total_duration(validated_segments)
             logger.info(f"Reduced from {len(segments)} to {len(validated_segments)} segments")
             logger.info(f"Final duration: {final_duration:.1f}s (target: {target_seconds}s)")
             return validated_segments
@@ -372,11 +442,13 @@ class VideoSummarizerPipeline:
         selected_segments = []
         current_total_duration = 0
         
+        # Assign segments to chunks in one pass instead of rescanning per chunk
+        chunk_bounds = [self._calculate_chunk_bounds(i, num_chunks, video_duration) for i in range(num_chunks)]
+        segments_by_chunk = self._bucket_segments_by_chunk(segments, chunk_bounds)
+        
         # Process each chunk to ensure temporal diversity
-        for chunk_idx in range(num_chunks):
-            # Calculate time boundaries for this chunk
-            chunk_start, chunk_end = self._calculate_chunk_bounds(chunk_idx, num_chunks, video_duration)
-            chunk_segments = self._get_segments_in_chunk(segments, chunk_start, chunk_end)
+        for chunk_idx, (chunk_start, chunk_end) in enumerate(chunk_bounds):
+            chunk_segments = segments_by_chunk[chunk_idx]
             
             if not chunk_segments:
                 logger.warning(f"No segments found in chunk {chunk_idx + 1} ({chunk_start:.1f}s - {chunk_end:.1f}s)")
@@ -398,7 +470,7 @@ class VideoSummarizerPipeline:
     
     def _calculate_video_duration(self, segments: List[Dict]) -> float:
         """Calculate total video duration from segments."""
-        return max(seg.get("end", 0) for seg in segments)
+        return max(seg["end"] for seg in segments)
     
     def _calculate_chunk_parameters(self, target_seconds: int, ideal_clip_duration: float) -> tuple[int, float]:
         """Calculate number of chunks and chunk duration."""
@@ -413,24 +485,29 @@ class VideoSummarizerPipeline:
         chunk_end = (chunk_idx + 1) * (video_duration / num_chunks)
         return chunk_start, chunk_end
     
-    def _get_segments_in_chunk(self, segments: List[Dict], chunk_start: float, chunk_end: float) -> List[Dict]:
-        """Get segments that fall within the specified chunk bounds."""
-        return [
-            seg for seg in segments 
-            if chunk_start <= seg.get("start", 0) < chunk_end
-        ]
+    def _bucket_segments_by_chunk(self, segments: List[Dict],
+                                  chunk_bounds: List[tuple[float, float]]) -> List[List[Dict]]:
+        """Group segments by the chunk their start time falls in, preserving score order."""
+        chunk_starts = [chunk_start for chunk_start, _ in chunk_bounds]
+        buckets = [[] for _ in chunk_bounds]
+        
+        for seg in segments:
+            start = seg["start"]
+            chunk_idx = bisect.bisect_right(chunk_starts, start) - 1
+            if chunk_idx >= 0 and start < chunk_bounds[chunk_idx][1]:
+                buckets[chunk_idx].append(seg)
+        
+        return buckets
     
     def _select_segments_from_chunk(self, chunk_segments: List[Dict], ideal_clip_duration: float, 
                                    target_seconds: int, current_total_duration: float, chunk_duration: float) -> tuple[List[Dict], float]:
         """Select segments from a chunk based on duration and quality criteria."""
-        # Sort by score and select the best segment(s) from this chunk
-        chunk_segments.sort(key=lambda x: x.get("score", 0), reverse=True)
-        
+        # chunk_segments is already in score order - select the best segment(s) from this chunk
         selected_segments = []
         chunk_duration_used = 0
         
         for segment in chunk_segments:
-            segment_duration = segment.get("end", 0) - segment.get("start", 0)
+            segment_duration = segment["end"] - segment["start"]
             
             # Check if segment meets duration criteria
             if not self._is_segment_duration_acceptable(segment_duration, ideal_clip_duration):
@@ -490,7 +567,7 @@ class VideoSummarizerPipeline:
             )
             
             selected_segments.extend(zone_selected)
-            current_duration += sum(seg.get("end", 0) - seg.get("start", 0) for seg in zone_selected)
+            current_duration += self._calculate_total_duration(zone_selected)
         
         return selected_segments
     
@@ -506,19 +583,17 @@ class VideoSummarizerPipeline:
         """Get segments that fall within the specified time zone."""
         return [
             seg for seg in segments 
-            if zone_start <= seg.get("start", 0) < zone_end
+            if zone_start <= seg["start"] < zone_end
         ]
     
     def _select_segments_from_time_zone(self, zone_segments: List[Dict], ideal_clip_duration: float, 
                                       target_seconds: int, current_duration: float) -> List[Dict]:
         """Select segments from a time zone based on duration and quality criteria."""
-        # Sort by score and take the best from this zone
-        zone_segments.sort(key=lambda x: x.get("score", 0), reverse=True)
-        
+        # zone_segments is already in score order - take the best from this zone
         selected_segments = []
         
         for segment in zone_segments:
-            segment_duration = segment.get("end", 0) - segment.get("start", 0)
+            segment_duration = segment["end"] - segment["start"]
             
             # Check if segment meets duration criteria
             if not self._is_segment_duration_acceptable(segment_duration, ideal_clip_duration):
@@ -537,14 +612,14 @@ class VideoSummarizerPipeline:
     
     def _select_by_score_with_diversity(self, segments: List[Dict], target_seconds: int) -> List[Dict]:
         """Select segments by score while maintaining some temporal diversity."""
-        sorted_segments = sorted(segments, key=lambda x: x.get("score", 0), reverse=True)
+        sorted_segments = sorted(segments, key=lambda x: x["score"], reverse=True)
         selected_segments = []
         current_duration = 0
         used_time_ranges = []  # Track used time ranges to avoid clustering
         
         for segment in sorted_segments:
-            segment_duration = segment.get("end", 0) - segment.get("start", 0)
-            segment_start = segment.get("start", 0)
+            segment_duration = segment["end"] - segment["start"]
+            segment_start = segment["start"]
             
             # Skip very long segments
             if segment_duration > target_seconds * 0.3:
@@ -577,7 +652,7 @@ class VideoSummarizerPipeline:
             return 0.0
         
         # Get segment start times
-        start_times = [seg.get("start", 0) for seg in segments]
+        start_times = [seg["start"] for seg in segments]
         start_times.sort()
         
         # Calculate gaps between consecutive segments
@@ -595,16 +670,17 @@ class VideoSummarizerPipeline:
     
     def _calculate_total_duration(self, segments: List[Dict]) -> float:
         """Calculate total duration of selected segments."""
-        return sum(seg.get("end", 0) - seg.get("start", 0) for seg in segments)
+        # map/itemgetter/sub keep the per-segment work in C
+        return sum(map(sub, map(itemgetter("end"), segments), map(itemgetter("start"), segments)))
     
     def _score_selection(self, segments: List[Dict], target_seconds: int) -> float:
         """Score a segment selection based on multiple factors."""
         if not segments:
             return 0.0
         
-        duration = sum(seg.get("end", 0) - seg.get("start", 0) for seg in segments)
+        duration = self._calculate_total_duration(segments)
         segment_count = len(segments)
-        avg_score = sum(seg.get("score", 0) for seg in segments) / len(segments)
+        avg_score = sum(map(itemgetter("score"), segments)) / len(segments)
         
         # Duration score: closer to target is better
         duration_ratio = duration / target_seconds
@@ -636,53 +712,46 @@ class VideoSummarizerPipeline:
     async def _export_highlights(self, input_video: str, segments: list) -> str:
         """Export highlights video."""
         try:
-            job_dir = Path(f"data/jobs/{self.job_id}")
-            highlights_path = job_dir / "highlights.mp4"
+            highlights_path = self.job_dir / "highlights.mp4"
+            
+            # Probe once per process for a hardware encoder, falling back to libx264
+            video_encoder = await detect_video_encoder(self.renderer.ffmpeg_path)
             
             logger.debug(f"Concatenating {len(segments)} segments into highlights video...")
-            await self.renderer.export_concat(input_video, segments, str(highlights_path))
+            await self.renderer.export_concat(input_video, segments, str(highlights_path), video_encoder)
             logger.debug(f"Highlights video created: {highlights_path}")
             return str(highlights_path)
             
         except Exception as e:
-            logger.error(f"Highlights export failed: {str(e)}")
             logger.error(f"Highlights export failed: {str(e)}")
             raise
     
-    async def _create_jump_to_json(self, segments: list, job_id: str) -> None:
+    async def _create_jump_to_json(self, segments: list) -> None:
         """Create jump_to.json for navigation."""
         try:
-            job_dir = Path(f"data/jobs/{job_id}")
-            jump_to_path = job_dir / self.JUMP_TO_FILE
+            jump_to_path = self.job_dir / self.JUMP_TO_FILE
             
             logger.debug(f"Creating navigation data for {len(segments)} highlights...")
             
             jump_to_data = {
                 "highlights": [
-                    {
-                        "start": seg["start"],
-                        "end": seg["end"],
-                        "label": seg["label"]
-                    }
+                    {"start": seg["start"], "end": seg["end"], "label": seg["label"]}
                     for seg in segments
                 ]
             }
             
-            async with aiofiles.open(jump_to_path, "w") as f:
-                await f.write(json.dumps(jump_to_data, indent=2))
+            await self._write_json_file(jump_to_path, jump_to_data)
             
             logger.debug(f"Navigation data created: {jump_to_path}")
             
         except Exception as e:
-            logger.error(f"Navigation data creation failed: {str(e)}")
-            logger.error(f"Jump-to JSON creation failed: {str(e)}")
+            logger.error(f"Navigation data (jump-to JSON) creation failed: {str(e)}")
             raise
     
-    async def _create_thumbnail(self, highlights_path: str, job_id: str) -> None:
+    async def _create_thumbnail(self, highlights_path: str) -> None:
         """Create thumbnail from highlights video."""
         try:
-            job_dir = Path(f"data/jobs/{job_id}")
-            thumbnail_path = job_dir / self.THUMBNAIL_FILE
+            thumbnail_path = self.job_dir / self.THUMBNAIL_FILE
             
             logger.info("Creating thumbnail from highlights video...")
             
@@ -704,19 +773,18 @@ class VideoSummarizerPipeline:
             logger.error(f"Thumbnail creation failed: {str(e)}")
             raise
     
-    async def _write_result_json(self, job_id: str, segments: list, target_seconds: int) -> None:
+    async def _write_result_json(self, segments: list, target_seconds: int) -> None:
         """Write final result.json with all metadata."""
         try:
-            job_dir = Path(f"data/jobs/{job_id}")
-            result_path = job_dir / "result.json"
+            result_path = self.job_dir / "result.json"
             
             logger.debug("Calculating final statistics...")
             
             # Calculate statistics
-            total_duration = sum(seg["end"] - seg["start"] for seg in segments)
+            total_duration = self._calculate_total_duration(segments)
             
             result_data = {
-                "job_id": job_id,
+                "job_id": str(self.job_id),
                 "status": "completed",
                 "created_at": datetime.now().isoformat(),
                 "target_seconds": target_seconds,
@@ -732,19 +800,28 @@ class VideoSummarizerPipeline:
                 "segments": segments
             }
             
-            async with aiofiles.open(result_path, "w") as f:
-                await f.write(json.dumps(result_data, indent=2))
+            await self._write_json_file(result_path, result_data)
             
             logger.debug(f"Final results written: {result_path}")
             logger.info(f"Summary: {len(segments)} segments, {total_duration:.1f}s total duration")
             
         except Exception as e:
-            logger.error(f"Result JSON creation failed: {str(e)}")
             logger.error(f"Result JSON creation failed: {str(e)}")
             raise
     
-    async def _run_ffmpeg(self, cmd: list) -> None:
-        """Run FFmpeg command with error handling and timeout."""
+    async def _write_json_file(self, path: Path, data: Dict[str, Any]) -> None:
+        """
+        Write a small JSON file in one blocking write off the event loop.
+        
+        orjson serializes straight to bytes, and a single write_bytes in the
+        default executor is cheaper than aiofiles' per-operation thread hops
+        for files of a few KB.
+        """
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        await asyncio.get_running_loop().run_in_executor(None, path.write_bytes, payload)
+    
+    async def _run_ffmpeg(self, cmd: list) -> bytes:
+        """Run FFmpeg command with error handling and timeout, returning its stdout."""
         try:
             logger.info(f"Running FFmpeg command: {' '.join(cmd)}")
             process = await asyncio.create_subprocess_exec(
@@ -755,7 +832,7 @@ class VideoSummarizerPipeline:
             
             # Add timeout to prevent hanging
             try:
-                _, stderr = await asyncio.wait_for(process.communicate(), timeout=300)  # 5 minute timeout
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)  # 5 minute timeout
             except asyncio.TimeoutError:
                 process.kill()
                 raise RuntimeError("FFmpeg command timed out after 5 minutes")
@@ -763,6 +840,8 @@ class VideoSummarizerPipeline:
             if process.returncode != 0:
                 error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
                 raise RuntimeError(f"FFmpeg failed: {error_msg}")
+            
+            return stdout
                 
         except Exception as e:
             logger.error(f"FFmpeg execution failed: {str(e)}")
@@ -771,38 +850,37 @@ class VideoSummarizerPipeline:
     def _update_job_status(self, status: JobStatus, error_message: Optional[str] = None):
         """Update job status in database."""
         try:
-            JobService.update_job_status(self.db_session, self.job_id, status, error_message)
-            self.db_session.commit()
+            JobService.update_job_bulk(self.db_session, self.job_id, status=status, error_message=error_message)
         except Exception as e:
             logger.error(f"Failed to update job status: {str(e)}")
             self.db_session.rollback()
     
-    def _update_job_paths(self, highlights_path: str, audio_path: str):
-        """Update job with output file paths."""
+    def _update_job_paths(self, highlights_path: str, status: Optional[JobStatus] = None):
+        """Update job with output file paths, and optionally its status, in one commit."""
         try:
-            job_dir = Path(f"data/jobs/{self.job_id}")
-            
             # Update file paths in database
             file_paths = {
-                "input_file_path": str(job_dir / "input.mp4"),
-                "audio_file_path": audio_path,
-                "transcript_file_path": str(job_dir / "transcript.json"),
-                "transcript_srt_path": str(job_dir / "transcript.srt"),
+                "input_file_path": str(self.job_dir / "input.mp4"),
+                "transcript_file_path": str(self.job_dir / "transcript.json"),
+                "transcript_srt_path": str(self.job_dir / "transcript.srt"),
                 "highlights_file_path": highlights_path,
-                "thumbnail_file_path": str(job_dir / self.THUMBNAIL_FILE),
-                "jump_to_file_path": str(job_dir / self.JUMP_TO_FILE),
-                "result_file_path": str(job_dir / "result.json")
+                "thumbnail_file_path": str(self.job_dir / self.THUMBNAIL_FILE),
+                "jump_to_file_path": str(self.job_dir / self.JUMP_TO_FILE),
+                "result_file_path": str(self.job_dir / "result.json")
             }
             
-            JobService.update_job_file_paths(
+            JobService.update_job_bulk(
                 self.db_session,
                 self.job_id,
-                file_paths
+                status=status,
+                file_paths=file_paths
             )
-            self.db_session.commit()
         except Exception as e:
             logger.error(f"Failed to update job paths: {str(e)}")
             self.db_session.rollback()
+            # The status must still land, or the job would stay PROCESSING forever
+            if status is not None:
+                self._update_job_status(status)
     
     def _calculate_metrics(self):
         """Calculate processing metrics."""
@@ -826,14 +904,13 @@ class VideoSummarizerPipeline:
         # Log to database for analytics
         try:
             # Store AI metrics in result.json
-            result_path = Path(f"data/jobs/{self.job_id}/result.json")
+            result_path = self.job_dir / "result.json"
             if result_path.exists():
-                async with aiofiles.open(result_path, 'r') as f:
-                    result_data = json.loads(await f.read())
+                async with aiofiles.open(result_path, 'rb') as f:
+                    result_data = orjson.loads(await f.read())
                 
                 result_data["processing_metrics"] = self.metrics
                 
-                async with aiofiles.open(result_path, 'w') as f:
-                    await f.write(json.dumps(result_data, indent=2))
+                await self._write_json_file(result_path, result_data)
         except Exception as e:
             logger.error(f"Failed to log processing results: {str(e)}")
@@ -7,14 +7,216 @@ important segments for video summarization.
 """
 
 import json
+import hashlib
 import logging
+import math
+import os
 import re
-from typing import List, Dict, Any, Optional
+import time
+import uuid
+from pathlib import Path
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
-from openai import AsyncOpenAI
+import aiofiles
+import bisect
+import httpx
+import orjson
+from array import array
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from openai import AsyncOpenAI, AuthenticationError, RateLimitError
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# OpenAI clients shared across rankers (one per API key) so jobs pool connections
+_shared_clients: Dict[Optional[str], AsyncOpenAI] = {}
+
+
+def _get_shared_client(api_key: Optional[str]) -> AsyncOpenAI:
+    """Get the process-wide OpenAI client for an API key, creating it on first use."""
+    client = _shared_clients.get(api_key)
+    if client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            http2=HTTP2_AVAILABLE  # Multiplex concurrent chunk requests over one connection
+        )
+        # Retries are handled by the ranking loop
+        client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+        _shared_clients[api_key] = client
+    return client
+
+
+# In-memory tier of the LLM response cache, shared by all rankers in this process
+_MEMORY_CACHE_SIZE = 256
+_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+
+# Transcript tokens packed into one LLM request, sized to each model's context
+# window minus the prompt preamble (~1k tokens) and the 2k-token response allowance
+_CHUNK_TOKEN_BUDGETS = {
+    "gpt-3.5-turbo": 12000,  # 16k context
+    "gpt-4": 5000,           # 8k context
+    "gpt-4-turbo": 100000,   # 128k context
+    "gpt-4o": 100000,        # 128k context
+}
+_DEFAULT_CHUNK_TOKEN_BUDGET = 3000
+
+# Models that accept response_format={"type": "json_object"}; base gpt-4 and the
+# 0613 snapshots reject it, so they get free-form responses parsed by regex
+_JSON_MODE_MODELS = ("gpt-3.5-turbo",)  # Alias for a JSON-mode snapshot
+_JSON_MODE_MODEL_PREFIXES = (
+    "gpt-3.5-turbo-1106", "gpt-3.5-turbo-0125",
+    "gpt-4-1106", "gpt-4-0125", "gpt-4-turbo", "gpt-4o", "gpt-4.1",
+)
+
+# Highlights object inside a free-form response, compiled once at import
+_HIGHLIGHTS_RE = re.compile(r'\{[^{}]*"highlights"[^{}]*\}', re.DOTALL)
+
+# Per-segment JSON overhead in the prompt payload ({"s":..,"e":..,"t":".."})
+_SEGMENT_TOKEN_OVERHEAD = 12
+
+# Static ranking prompt, built once at import; only the small variable parts are filled per chunk
+_RANKING_PROMPT_TEMPLATE = """You are a video summarization expert. Create the perfect {target_seconds}-second highlight reel from this transcript.
+
+## 🎯 TASK
+Select the BEST moments that tell the complete story targeting {target_seconds} seconds total duration.
+
+## 📋 SELECT THE BEST:
+- Key insights and important information
+- Conclusions and takeaways
+- Actionable advice and practical tips
+- Memorable quotes and emotional moments
+- Data points and statistics
+- Problem-solution pairs
+
+## ⏱️ CRITICAL REQUIREMENTS:
+- Total duration: Target {target_seconds} seconds (±10% acceptable)
+- Segment count: Aim for {expected_segments} segments for optimal pacing
+- Each segment: {ideal_duration:.1f} seconds long (dynamic duration based on target)
+- Spread across timeline (beginning, middle, end)
+- Quality over quantity - be selective but comprehensive
+
+## 🎬 HIGHLIGHT REEL STRATEGY
+- **Dynamic clip duration**: Target {ideal_duration:.1f}s clips for {target_seconds}s video (scales with duration)
+- **Optimal segment count**: {expected_segments} segments for perfect pacing
+- **Temporal diversity**: Spread segments across the entire video timeline
+- **Duration scaling**: Shorter clips for short videos, longer clips for long videos
+- **Story flow**: Ensure segments connect to tell a coherent story
+- **BALANCED COVERAGE**: Include content from beginning, middle, and end of video
+- **AVOID CLUSTERING**: Don't select multiple segments from the same time period
+- **COMPREHENSIVE VIEW**: Cover different topics/aspects discussed in the video
+- **CHUNK-BASED SELECTION**: System will divide video into equal chunks and select from each
+- **KEY PHRASES**: Focus on key phrases, product names, and important announcements
+- **SMART DURATION**: Each clip should be close to {ideal_duration:.1f}s for optimal pacing
+
+## 🔍 QUALITY CHECKS
+Before selecting each highlight, ask:
+- Does this advance the main narrative?
+- Is this information essential for understanding?
+- Does this connect logically to other highlights?
+- Would a viewer understand the context without additional segments?
+- Is this segment temporally diverse from other selected highlights?
+
+## 📍 TEMPORAL DISTRIBUTION STRATEGY
+- **Beginning (0-25%)**: Include opening context, problem statement, or key introduction
+- **Middle (25-75%)**: Cover main content, examples, explanations, and developments
+- **End (75-100%)**: Include conclusions, takeaways, and final thoughts
+- **Avoid clustering**: Don't select multiple segments from the same time period
+- **Balance coverage**: Ensure all major topics/aspects are represented
+- **COMPREHENSIVE COVERAGE**: For presentations like keynotes, include segments from different products/topics
+- **AVOID SINGLE-FOCUS**: Don't focus only on one product/topic - spread across the entire presentation
+- **TIMELINE DIVERSITY**: Ensure segments are spread across the full video duration, not clustered together
+
+## 📊 OUTPUT FORMAT
+Return STRICT JSON only:
+```json
+{{
+  "highlights": [
+    {{
+      "start": 45.2,
+      "end": 52.8,
+      "score": 0.9,
+      "label": "Key insight about...",
+      "reason": "Contains main conclusion with supporting data"
+    }}
+  ]
+}}
+```
+
+## 🚫 AVOID
+- Selecting segments that are too short (< 2 seconds) unless they contain critical information
+- Creating highlights that don't connect to each other
+- Including repetitive or redundant content
+- Selecting segments with poor audio quality or unclear speech
+- Choosing highlights that require extensive context to understand
+- Artificially limiting segment length - let content determine appropriate duration
+
+## 📝 SEGMENT ANALYSIS
+For each potential highlight, consider:
+- **Content Value**: How much essential information does it contain?
+- **Narrative Position**: Where does it fit in the overall story?
+- **Clarity**: Is the information clearly communicated?
+- **Uniqueness**: Does it add something not covered elsewhere?
+
+INPUT TRANSCRIPT SEGMENTS (compact JSON: "s" = start seconds, "e" = end seconds, "t" = text):
+{segments_json}
+
+Remember: You're creating a mini-documentary that tells the complete story in {target_seconds} seconds. Every second counts - make it compelling and informative."""
+
+@lru_cache(maxsize=32)
+def _ranking_prompt_parts(target_seconds: int) -> Tuple[str, str]:
+    """
+    Render the ranking prompt around the segments payload for a target duration.
+    
+    Everything except the transcript depends only on target_seconds, so the
+    text before and after the payload is built once and reused for every chunk.
+    
+    Returns:
+        Tuple of (prefix, suffix) to concatenate around the segments JSON
+    """
+    # Calculate dynamic clip duration for the prompt
+    base_duration = math.sqrt(target_seconds) * 0.8 + 2
+    if target_seconds <= 60:
+        ideal_duration = base_duration * 0.7
+    elif target_seconds <= 300:
+        ideal_duration = base_duration
+    else:
+        ideal_duration = base_duration * 1.2
+    ideal_duration = max(3.0, min(20.0, ideal_duration))
+    
+    # Calculate expected number of segments
+    expected_segments = int(target_seconds / ideal_duration)
+    
+    values = {
+        "target_seconds": target_seconds,
+        "expected_segments": expected_segments,
+        "ideal_duration": ideal_duration
+    }
+    prefix, suffix = _RANKING_PROMPT_TEMPLATE.split("{segments_json}")
+    return prefix.format_map(values), suffix.format_map(values)
+
 class LLMRanker:
     """
     LLM-based ranking service using OpenAI API.
@@ -23,7 +225,8 @@ class LLMRanker:
     for video summarization. Handles chunking, retry logic, and error recovery.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo",
+                 embedding_model: Optional[str] = None):
         """
         Initialize the LLM ranker with OpenAI client.
         
@@ -33,18 +236,34 @@ class LLMRanker:
         Args:
             api_key: OpenAI API key (if None, will use environment variable)
             model: OpenAI model to use for ranking (default: gpt-3.5-turbo)
+            embedding_model: Optional sentence-transformers model used to pre-select
+                             candidate segments locally before the LLM call
+                             (e.g. "sentence-transformers/all-MiniLM-L6-v2")
         """
+        self.model = model
+        self.embedding_model = embedding_model if SENTENCE_TRANSFORMERS_AVAILABLE else None
+        self._embedder = None  # Loaded lazily on first use
+        if embedding_model and not SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.warning("sentence-transformers not installed - embedding pre-selection disabled")
+        self.max_tokens_per_chunk = self._chunk_token_budget(model)  # Pack chunks up to the model context
+        self.json_mode = model in _JSON_MODE_MODELS or model.startswith(_JSON_MODE_MODEL_PREFIXES)
+        self._encoding = self._load_encoding(model)
+        self.max_retries = 3  # Maximum retry attempts for API calls
+        self.max_concurrent_chunks = 4  # Chunks ranked in parallel against the API
+        self.cache_dir = Path("data/cache/llm")  # Responses keyed by model + prompt hash
+        self._chunk_semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+        self.connection_probe_ttl = 60.0  # Seconds a test_connection result is reused
+        self._last_probe_ts: Optional[float] = None
+        self._last_probe_ok = False
         try:
-            self.client = AsyncOpenAI(api_key=api_key)
-            self.model = model
-            self.max_tokens_per_chunk = 3000  # ~2-3k tokens per chunk to avoid context limits
-            self.max_retries = 3  # Maximum retry attempts for API calls
+            self.client = _get_shared_client(api_key)
             self.available = True
         except Exception as e:
             logger.warning(f"LLM ranker initialization failed: {e}")
             self.available = False
     
-    async def rank_segments(self, transcript_segments: List[Dict], target_seconds: int) -> Dict[str, Any]:
+    async def rank_segments(self, transcript_segments: List[Dict], target_seconds: int,
+                            token_counts: Optional[List[int]] = None) -> Dict[str, Any]:
         """
         Rank transcription segments by importance using LLM analysis.
         
@@ -55,6 +274,8 @@ class LLMRanker:
         Args:
             transcript_segments: List of segment dicts with start, end, text
             target_seconds: Target duration for highlights in seconds
+            token_counts: estimate_tokens() values aligned with transcript_segments,
+                          when the caller already computed them (default: counted here)
             
         Returns:
             Dict with highlights array containing ranked segments
@@ -66,24 +287,51 @@ class LLMRanker:
             raise RuntimeError("LLM ranker not available - no API key or connection failed")
             
         try:
-            # Test connection first
-            if not await self.test_connection():
-                raise RuntimeError("LLM service not accessible")
-                
+            # Optionally narrow the transcript to the most central segments locally,
+            # so the LLM only labels and scores a small candidate set
+            if self.embedding_model:
+                loop = asyncio.get_running_loop()
+                transcript_segments = await loop.run_in_executor(
+                    None, self._select_candidates_by_embedding, transcript_segments, target_seconds
+                )
+                token_counts = None  # No longer aligned with the narrowed segments
+            
+            # No pre-flight connection test - the first chunk request surfaces
+            # connectivity problems and _request_highlights retries transient failures
             # Chunk transcript into manageable pieces
-            chunks = self._chunk_transcript(transcript_segments)
+            chunks = self._chunk_transcript(transcript_segments, token_counts)
+            prompts = [self._create_ranking_prompt(chunk, target_seconds) for chunk in chunks]
+            cache_keys = [self._prompt_cache_key(prompt) for prompt in prompts]
             
-            all_highlights = []
+            # Identical prompts (repeated content, boilerplate intros) are sent once
+            # and their highlights shared by every chunk that produced them
+            unique_prompts = dict(zip(cache_keys, prompts))
             
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Processing chunk {i+1}/{len(chunks)} with {len(chunk)} segments")
-                
-                # Get highlights for this chunk
-                chunk_highlights = await self._rank_chunk(chunk, target_seconds)
-                all_highlights.extend(chunk_highlights)
+            async def rank_one(i: int, cache_key: str, prompt: str) -> List[Dict]:
+                # Bound the number of requests this ranker has in flight
+                async with self._chunk_semaphore:
+                    logger.info("Processing chunk %d/%d", i + 1, len(unique_prompts))
+                    return await self._ranked_highlights(prompt, cache_key)
+            
+            # Get highlights for all unique prompts concurrently
+            unique_results = dict(zip(unique_prompts, await asyncio.gather(
+                *(rank_one(i, cache_key, prompt) for i, (cache_key, prompt) in enumerate(unique_prompts.items())),
+                return_exceptions=True
+            )))
+            
+            all_highlights = []
+            for i, (chunk, cache_key) in enumerate(zip(chunks, cache_keys)):
+                chunk_highlights = unique_results[cache_key]
+                if isinstance(chunk_highlights, AuthenticationError):
+                    # A bad API key fails every chunk - surface it instead of returning nothing
+                    raise chunk_highlights
+                if isinstance(chunk_highlights, BaseException):
+                    logger.warning(f"Chunk {i+1}/{len(chunks)} ranking failed: {str(chunk_highlights)}")
+                    continue
+                all_highlights.extend(self._validate_highlights(chunk_highlights, chunk))
             
             # Sort all highlights by score and return
-            all_highlights.sort(key=lambda x: x["score"], reverse=True)
+            all_highlights.sort(key=itemgetter("score"), reverse=True)
             
             result = {
                 "highlights": all_highlights
@@ -96,16 +344,109 @@ class LLMRanker:
             logger.error(f"LLM ranking failed: {str(e)}")
             raise
     
-    def _chunk_transcript(self, segments: List[Dict]) -> List[List[Dict]]:
-        """Chunk transcript into ~2-3k token pieces."""
+    def _select_candidates_by_embedding(self, segments: List[Dict], target_seconds: int) -> List[Dict]:
+        """
+        Pre-select candidate segments by similarity to the transcript centroid.
+        
+        All segment texts are embedded in one batch; segments are considered in
+        descending similarity to the overall topic, skipping any that start within
+        5 seconds of an already chosen one, until twice the target duration is
+        covered. Candidates are returned in timeline order. Short transcripts are
+        returned unchanged.
+        
+        Selection is relative to the segments passed in, so callers should pass
+        the whole transcript for a global top-K (the pipeline does this when an
+        embedding model is configured).
+        """
+        candidate_budget = target_seconds * 2.0
+        total_duration = sum(seg["end"] - seg["start"] for seg in segments)
+        if total_duration <= candidate_budget:
+            return segments
+        
+        if self._embedder is None:
+            logger.info(f"Loading embedding model: {self.embedding_model}")
+            self._embedder = SentenceTransformer(self.embedding_model)
+        
+        embeddings = self._embedder.encode(
+            [seg["text"] for seg in segments],
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        centroid = embeddings.mean(axis=0)
+        centroid /= np.linalg.norm(centroid) or 1.0
+        similarities = embeddings @ centroid
+        
+        selected = []
+        selected_starts = []
+        selected_duration = 0.0
+        for idx in np.argsort(-similarities):
+            seg = segments[idx]
+            # Temporal non-maximum suppression: keep candidates spread across the timeline
+            pos = bisect.bisect_left(selected_starts, seg["start"])
+            if (pos > 0 and seg["start"] - selected_starts[pos - 1] < 5.0) or \
+               (pos < len(selected_starts) and selected_starts[pos] - seg["start"] < 5.0):
+                continue
+            
+            selected_starts.insert(pos, seg["start"])
+            selected.insert(pos, seg)
+            selected_duration += seg["end"] - seg["start"]
+            if selected_duration >= candidate_budget:
+                break
+        
+        logger.info(f"Embedding pre-selection kept {len(selected)}/{len(segments)} segments")
+        return selected
+    
+    @staticmethod
+    def _chunk_token_budget(model: str) -> int:
+        """Get the transcript token budget for a model (longest matching prefix)."""
+        for prefix in sorted(_CHUNK_TOKEN_BUDGETS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return _CHUNK_TOKEN_BUDGETS[prefix]
+        return _DEFAULT_CHUNK_TOKEN_BUDGET
+    
+    @staticmethod
+    def _load_encoding(model: str):
+        """Load the tiktoken encoding for a model, or None to use the char heuristic."""
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+            return None
+    
+    def _chunk_transcript(self, segments: List[Dict],
+                          token_counts: Optional[List[int]] = None) -> List[List[Dict]]:
+        """Pack the transcript into chunks that fill the model's context budget.
+        
+        token_counts, when given, are estimate_tokens() values aligned with segments
+        and are reused instead of tokenizing the texts again.
+        """
+        # Skip empty and repeated segments (common Whisper artifacts)
+        kept = []
+        kept_tokens = []
+        previous_text = None
+        for i, segment in enumerate(segments):
+            text = segment["text"].strip()
+            if not text or text == previous_text:
+                continue
+            previous_text = text
+            kept.append(segment)
+            if token_counts is not None:
+                kept_tokens.append(token_counts[i])
+        
+        # Otherwise count the whole transcript in one batched encode
+        if token_counts is None:
+            kept_tokens = self._count_tokens([seg["text"] for seg in kept])
+        
         chunks = []
         current_chunk = []
         current_tokens = 0
         
-        for segment in segments:
-            # Rough token estimation (4 chars per token)
-            segment_tokens = len(segment["text"]) // 4
-            
+        for segment, segment_tokens in zip(kept, kept_tokens):
             if current_tokens + segment_tokens > self.max_tokens_per_chunk and current_chunk:
                 chunks.append(current_chunk)
                 current_chunk = [segment]
@@ -119,22 +460,158 @@ class LLMRanker:
         
         return chunks
     
-    async def _rank_chunk(self, chunk_segments: List[Dict], target_seconds: int) -> List[Dict]:
-        """Rank a single chunk of segments."""
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Prompt token counts for many segment texts (batched with tiktoken, else 4 chars per token)."""
+        if self._encoding is not None:
+            return [len(tokens) + _SEGMENT_TOKEN_OVERHEAD for tokens in self._encoding.encode_batch(texts)]
+        return [len(text) // 4 + _SEGMENT_TOKEN_OVERHEAD for text in texts]
+    
+    def estimate_tokens(self, segment: Dict) -> int:
+        """Token count for a segment in the prompt payload (exact with tiktoken, else 4 chars per token)."""
+        # Plain encode - encode_batch spins up a thread pool per call
+        if self._encoding is not None:
+            return len(self._encoding.encode(segment["text"])) + _SEGMENT_TOKEN_OVERHEAD
+        return len(segment["text"]) // 4 + _SEGMENT_TOKEN_OVERHEAD
+    
+    async def rank_segments_batch(self, transcript_segments: List[Dict], target_seconds: int,
+                                  poll_interval: float = 30.0) -> Dict[str, Any]:
+        """
+        Rank transcription segments through the OpenAI Batch API.
+        
+        Intended for non-interactive work such as re-processing a video library:
+        batch requests cost half as much and don't count against the per-minute
+        rate limits, but complete within hours rather than seconds. Chunks with a
+        cached response are not resubmitted.
+        
+        Args:
+            transcript_segments: List of segment dicts with start, end, text
+            target_seconds: Target duration for highlights in seconds
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            Dict with highlights array containing ranked segments
+            
+        Raises:
+            RuntimeError: If LLM ranker is not available or the batch does not complete
+        """
+        if not self.available:
+            raise RuntimeError("LLM ranker not available - no API key or connection failed")
+        
+        try:
+            chunks = self._chunk_transcript(transcript_segments)
+            all_highlights = []
+            pending = {}  # custom_id -> (chunk, cache_key)
+            request_lines = []
+            
+            for i, chunk in enumerate(chunks):
+                prompt = self._create_ranking_prompt(chunk, target_seconds)
+                cache_key = self._prompt_cache_key(prompt)
+                cached_content = await self._read_cached_response(cache_key)
+                if cached_content is not None:
+                    try:
+                        all_highlights.extend(
+                            self._validate_highlights(self._parse_llm_response(cached_content), chunk)
+                        )
+                        continue
+                    except ValueError as e:
+                        logger.warning(f"Ignoring unusable cached LLM response: {str(e)}")
+                
+                custom_id = f"chunk_{i}"
+                pending[custom_id] = (chunk, cache_key)
+                request_lines.append(orjson.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._completion_params(prompt)
+                }))
+            
+            if pending:
+                logger.info(f"Submitting {len(pending)}/{len(chunks)} chunks as an OpenAI batch")
+                batch_file = await self.client.files.create(
+                    file=("ranking_batch.jsonl", b"\n".join(request_lines)),
+                    purpose="batch"
+                )
+                batch = await self.client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h"
+                )
+                
+                while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                    await asyncio.sleep(poll_interval)
+                    batch = await self.client.batches.retrieve(batch.id)
+                
+                # Expired batches still return the requests that finished in time
+                if not batch.output_file_id:
+                    raise RuntimeError(f"Ranking batch {batch.id} ended with status {batch.status}")
+                output = await self.client.files.content(batch.output_file_id)
+                
+                for line in output.text.splitlines():
+                    if not line.strip():
+                        continue
+                    result = orjson.loads(line)
+                    chunk, cache_key = pending[result["custom_id"]]
+                    response = result.get("response") or {}
+                    if response.get("status_code") != 200:
+                        logger.warning(f"Batch request {result['custom_id']} failed: {result.get('error')}")
+                        continue
+                    try:
+                        content = response["body"]["choices"][0]["message"]["content"]
+                        highlights = self._parse_llm_response(content)
+                    except (KeyError, IndexError, TypeError, ValueError) as e:
+                        logger.warning(f"Unusable batch response for {result['custom_id']}: {str(e)}")
+                        continue
+                    await self._write_cached_response(cache_key, content)
+                    all_highlights.extend(self._validate_highlights(highlights, chunk))
+            
+            # Sort all highlights by score and return
+            all_highlights.sort(key=lambda x: x["score"], reverse=True)
+            
+            logger.info(f"LLM batch ranking completed: {len(all_highlights)} highlights selected")
+            return {"highlights": all_highlights}
+            
+        except Exception as e:
+            logger.error(f"LLM batch ranking failed: {str(e)}")
+            raise
+    
+    def _completion_params(self, prompt: str) -> Dict[str, Any]:
+        """Chat completion parameters for a ranking prompt (shared by live and batch requests)."""
+        params = {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 2000,
+        }
+        if self.json_mode:
+            params["response_format"] = {"type": "json_object"}  # Guarantees a bare JSON object
+        return params
+    
+    def _prompt_cache_key(self, prompt: str) -> str:
+        """Response cache key for a ranking prompt sent to this ranker's model."""
+        return hashlib.sha256((self.model + prompt).encode("utf-8")).hexdigest()
+    
+    async def _ranked_highlights(self, prompt: str, cache_key: str) -> List[Dict]:
+        """Unvalidated highlights for a prompt, from the response cache or the LLM."""
+        # Identical prompts (re-runs, retried jobs) reuse the cached response
+        cached_content = await self._read_cached_response(cache_key)
+        if cached_content is not None:
+            try:
+                highlights = self._parse_llm_response(cached_content)
+                logger.debug("Using cached LLM response %.12s", cache_key)
+                return highlights
+            except ValueError as e:
+                logger.warning(f"Ignoring unusable cached LLM response: {str(e)}")
+        
+        return await self._request_highlights(prompt, cache_key)
+    
+    async def _request_highlights(self, prompt: str, cache_key: str) -> List[Dict]:
+        """Send a ranking prompt to the LLM with retries and return the parsed highlights."""
         for attempt in range(self.max_retries):
             try:
-                # Create prompt
-                prompt = self._create_ranking_prompt(chunk_segments, target_seconds)
-                
                 # Call LLM
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=2000
-                )
+                response = await self.client.chat.completions.create(**self._completion_params(prompt))
                 
                 # Parse response
                 content = response.choices[0].message.content
@@ -142,147 +619,112 @@ class LLMRanker:
                     raise ValueError("Empty response from LLM")
                 highlights = self._parse_llm_response(content)
                 
-                # Validate and cap highlights
-                validated_highlights = self._validate_highlights(highlights, chunk_segments)
+                # Only cache responses that parsed, so bad output is retried next time
+                await self._write_cached_response(cache_key, content)
                 
-                return validated_highlights
+                return highlights
                 
+            except AuthenticationError:
+                # Retrying cannot fix an invalid API key
+                raise
             except Exception as e:
                 logger.warning(f"LLM attempt {attempt + 1} failed: {str(e)}")
                 if attempt == self.max_retries - 1:
                     # Final fallback: return empty highlights
                     return []
+                await asyncio.sleep(self._retry_delay(e, attempt))
         
         return []
     
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying, honoring Retry-After on rate limits."""
+        backoff = float(2 ** attempt)
+        if isinstance(error, RateLimitError):
+            retry_after = error.response.headers.get("retry-after")
+            try:
+                return max(backoff, float(retry_after))
+            except (TypeError, ValueError):
+                return backoff * 2  # Rate limited without a usable hint, back off harder
+        return backoff
+    
+    async def _read_cached_response(self, cache_key: str) -> Optional[str]:
+        """Read a cached LLM response (memory first, then disk), returning None on a miss."""
+        content = _memory_cache.get(cache_key)
+        if content is not None:
+            _memory_cache.move_to_end(cache_key)
+            return content
+        
+        cache_path = self.cache_dir / f"{cache_key}.json"
+        try:
+            async with aiofiles.open(cache_path, "rb") as f:
+                content = orjson.loads(await f.read())["content"]
+            self._remember_response(cache_key, content)
+            return content
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read LLM cache entry {cache_path}: {str(e)}")
+            return None
+    
+    async def _write_cached_response(self, cache_key: str, content: str) -> None:
+        """Cache an LLM response in memory and atomically on disk (temp file, then rename)."""
+        self._remember_response(cache_key, content)
+        cache_path = self.cache_dir / f"{cache_key}.json"
+        temp_path = cache_path.with_name(f"{cache_key}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(temp_path, "wb") as f:
+                await f.write(orjson.dumps({"model": self.model, "content": content}))
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {cache_path}: {str(e)}")
+    
+    @staticmethod
+    def _remember_response(cache_key: str, content: str) -> None:
+        """Store a response in the in-memory cache, evicting the least recently used."""
+        _memory_cache[cache_key] = content
+        _memory_cache.move_to_end(cache_key)
+        if len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+    
     def _create_ranking_prompt(self, segments: List[Dict], target_seconds: int) -> str:
         """Create the prompt for LLM ranking."""
-        segments_json = json.dumps(segments, indent=2)
-        
-        # Calculate dynamic clip duration for the prompt
-        import math
-        base_duration = math.sqrt(target_seconds) * 0.8 + 2
-        if target_seconds <= 60:
-            ideal_duration = base_duration * 0.7
-        elif target_seconds <= 300:
-            ideal_duration = base_duration
-        else:
-            ideal_duration = base_duration * 1.2
-        ideal_duration = max(3.0, min(20.0, ideal_duration))
-        
-        # Calculate expected number of segments
-        expected_segments = int(target_seconds / ideal_duration)
-        
-        return f"""You are a video summarization expert. Create the perfect {target_seconds}-second highlight reel from this transcript.
-
-## 🎯 TASK
-Select the BEST moments that tell the complete story targeting {target_seconds} seconds total duration.
-
-## 📋 SELECT THE BEST:
-- Key insights and important information
-- Conclusions and takeaways
-- Actionable advice and practical tips
-- Memorable quotes and emotional moments
-- Data points and statistics
-- Problem-solution pairs
-
-## ⏱️ CRITICAL REQUIREMENTS:
-- Total duration: Target {target_seconds} seconds (±10% acceptable)
-- Segment count: Aim for {expected_segments} segments for optimal pacing
-- Each segment: {ideal_duration:.1f} seconds long (dynamic duration based on target)
-- Spread across timeline (beginning, middle, end)
-- Quality over quantity - be selective but comprehensive
-
-## 🎬 HIGHLIGHT REEL STRATEGY
-- **Dynamic clip duration**: Target {ideal_duration:.1f}s clips for {target_seconds}s video (scales with duration)
-- **Optimal segment count**: {expected_segments} segments for perfect pacing
-- **Temporal diversity**: Spread segments across the entire video timeline
-- **Duration scaling**: Shorter clips for short videos, longer clips for long videos
-- **Story flow**: Ensure segments connect to tell a coherent story
-- **BALANCED COVERAGE**: Include content from beginning, middle, and end of video
-- **AVOID CLUSTERING**: Don't select multiple segments from the same time period
-- **COMPREHENSIVE VIEW**: Cover different topics/aspects discussed in the video
-- **CHUNK-BASED SELECTION**: System will divide video into equal chunks and select from each
-- **KEY PHRASES**: Focus on key phrases, product names, and important announcements
-- **SMART DURATION**: Each clip should be close to {ideal_duration:.1f}s for optimal pacing
-
-## 🔍 QUALITY CHECKS
-Before selecting each highlight, ask:
-- Does this advance the main narrative?
-- Is this information essential for understanding?
-- Does this connect logically to other highlights?
-- Would a viewer understand the context without additional segments?
-- Is this segment temporally diverse from other selected highlights?
-
-## 📍 TEMPORAL DISTRIBUTION STRATEGY
-- **Beginning (0-25%)**: Include opening context, problem statement, or key introduction
-- **Middle (25-75%)**: Cover main content, examples, explanations, and developments
-- **End (75-100%)**: Include conclusions, takeaways, and final thoughts
-- **Avoid clustering**: Don't select multiple segments from the same time period
-- **Balance coverage**: Ensure all major topics/aspects are represented
-- **COMPREHENSIVE COVERAGE**: For presentations like keynotes, include segments from different products/topics
-- **AVOID SINGLE-FOCUS**: Don't focus only on one product/topic - spread across the entire presentation
-- **TIMELINE DIVERSITY**: Ensure segments are spread across the full video duration, not clustered together
-
-## 📊 OUTPUT FORMAT
-Return STRICT JSON only:
-```json
-{{
-  "highlights": [
-    {{
-      "start": 45.2,
-      "end": 52.8,
-      "score": 0.9,
-      "label": "Key insight about...",
-      "reason": "Contains main conclusion with supporting data"
-    }}
-  ]
-}}
-```
-
-## 🚫 AVOID
-- Selecting segments that are too short (< 2 seconds) unless they contain critical information
-- Creating highlights that don't connect to each other
-- Including repetitive or redundant content
-- Selecting segments with poor audio quality or unclear speech
-- Choosing highlights that require extensive context to understand
-- Artificially limiting segment length - let content determine appropriate duration
-
-## 📝 SEGMENT ANALYSIS
-For each potential highlight, consider:
-- **Content Value**: How much essential information does it contain?
-- **Narrative Position**: Where does it fit in the overall story?
-- **Clarity**: Is the information clearly communicated?
-- **Uniqueness**: Does it add something not covered elsewhere?
-
-INPUT TRANSCRIPT SEGMENTS:
-{segments_json}
-
-Remember: You're creating a mini-documentary that tells the complete story in {target_seconds} seconds. Every second counts - make it compelling and informative."""
+        # Compact payload: short keys, rounded times, no indentation (orjson never escapes non-ASCII)
+        segments_json = orjson.dumps(
+            [{"s": round(seg["start"], 2), "e": round(seg["end"], 2), "t": seg["text"]} for seg in segments]
+        ).decode("utf-8")
+        
+        # Static text is rendered once per target duration, so chunks only add the payload
+        prefix, suffix = _ranking_prompt_parts(target_seconds)
+        return prefix + segments_json + suffix
     
     def _parse_llm_response(self, response: str) -> List[Dict]:
         """Parse LLM response and extract highlights."""
         try:
-            # Clean up response
-            response = response.strip()
-            
-            # Try to find JSON in the response
-            json_match = re.search(r'\{[^{}]*"highlights"[^{}]*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-            else:
-                # Try to find any JSON object
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
+            try:
+                # JSON mode responses parse directly
+                data = orjson.loads(response)
+            except orjson.JSONDecodeError:
+                # Clean up response
+                response = response.strip()
+                
+                # Try to find JSON in the response
+                json_match = _HIGHLIGHTS_RE.search(response)
+                if json_match:
+                    json_str = json_match.group(0)
                 else:
-                    raise ValueError("No JSON found in response")
-            
-            # Parse JSON
-            data = json.loads(json_str)
+                    # Try to find any JSON object
+                    json_start = response.find('{')
+                    json_end = response.rfind('}') + 1
+                    if json_start >= 0 and json_end > json_start:
+                        json_str = response[json_start:json_end]
+                    else:
+                        raise ValueError("No JSON found in response")
+                
+                # Parse JSON
+                data = orjson.loads(json_str)
             
-            if "highlights" not in data:
+            if not isinstance(data, dict) or "highlights" not in data:
                 raise ValueError("No highlights key in response")
             
             return data["highlights"]
@@ -298,10 +740,9 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
         """Validate and cap highlights to ensure they're within segment bounds."""
         validated = []
         
-        # Create segment lookup for validation
-        segment_lookup = {}
-        for seg in segments:
-            segment_lookup[(seg["start"], seg["end"])] = seg
+        # Segment boundary arrays (segments are in timeline order) for O(log S) lookups
+        starts = array('d', (seg["start"] for seg in segments))
+        ends = array('d', (seg["end"] for seg in segments))
         
         for highlight in highlights:
             try:
@@ -311,6 +752,11 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
                 label = str(highlight.get("label", ""))
                 reason = str(highlight.get("reason", ""))
                 
+                # Cheap score filter first so rejected highlights skip the boundary lookups
+                if score < 0.3:
+                    logger.debug("Highlight filtered out due to low score: %s-%s", start, end)
+                    continue
+                
                 # Enhanced duration validation (flexible for different video types)
                 duration = end - start
                 if duration < 2.0:
@@ -319,10 +765,10 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
                 # Remove artificial upper limit - let the AI decide appropriate segment length
                 
                 # Validate against segment boundaries
-                start, end = self._clamp_to_segments(start, end, segments)
+                start, end = self._clamp_to_segments(start, end, segments, starts, ends)
                 
                 # Quality checks
-                if self._is_quality_highlight(start, end, score, segments):
+                if self._is_quality_highlight(start, end, score, segments, starts, ends):
                     validated.append({
                         "start": start,
                         "end": end,
@@ -331,17 +777,18 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
                         "reason": reason
                     })
                 else:
-                    logger.debug(f"Highlight filtered out due to quality checks: {start}-{end}")
+                    logger.debug("Highlight filtered out due to quality checks: %s-%s", start, end)
                     
             except (ValueError, KeyError) as e:
-                logger.warning(f"Invalid highlight skipped: {e}")
+                logger.warning("Invalid highlight skipped: %s", e)
                 continue
         
         # Sort by score and apply final quality filters
         validated.sort(key=lambda x: x["score"], reverse=True)
         return self._apply_final_quality_filters(validated)
     
-    def _is_quality_highlight(self, start: float, end: float, score: float, segments: List[Dict]) -> bool:
+    def _is_quality_highlight(self, start: float, end: float, score: float, segments: List[Dict],
+                              starts: array, ends: array) -> bool:
         """Check if highlight meets quality standards."""
         # Must have meaningful score
         if score < 0.3:
@@ -352,14 +799,13 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
         if duration < 1.0:  # Only filter out very short segments
             return False
         
-        # Check if the segment contains meaningful content
-        for seg in segments:
-            if seg["start"] <= start <= seg["end"] and seg["start"] <= end <= seg["end"]:
-                text = seg["text"].strip()
-                # Filter out very short or repetitive content
-                if len(text) < 20 or self._is_repetitive_content(text):
-                    return False
-                break
+        # Check if the segment containing the whole highlight has meaningful content
+        idx = bisect.bisect_right(starts, start) - 1
+        if idx >= 0 and start <= ends[idx] and end <= ends[idx]:
+            text = segments[idx]["text"].strip()
+            # Filter out very short or repetitive content
+            if len(text) < 20 or self._is_repetitive_content(text):
+                return False
         
         return True
     
@@ -370,12 +816,15 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
             return False
         
         # Check for repeated phrases
-        word_counts = {}
-        for word in words:
-            word_counts[word] = word_counts.get(word, 0) + 1
+        word_counts = Counter(words)
+        
+        # The most frequent word can appear at most len(words) - unique + 1 times,
+        # so mostly-unique text can be accepted without finding the maximum
+        if len(words) - len(word_counts) + 1 <= len(words) * 0.3:
+            return False
         
         # If any word appears more than 30% of the time, it's repetitive
-        max_frequency = max(word_counts.values()) / len(words)
+        max_frequency = word_counts.most_common(1)[0][1] / len(words)
         return max_frequency > 0.3
     
     def _apply_final_quality_filters(self, highlights: List[Dict]) -> List[Dict]:
@@ -383,34 +832,29 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
         if not highlights:
             return highlights
         
-        # Remove overlapping highlights
+        # Remove overlapping highlights, keeping the higher-scored one (input is score-sorted).
+        # Kept highlights never overlap, so ordering them by start also orders their ends,
+        # and one bisect finds the only kept highlight a candidate could overlap.
         filtered = []
+        kept_starts = []
         for highlight in highlights:
-            is_overlapping = False
-            for existing in filtered:
-                if self._highlights_overlap(highlight, existing):
-                    # Keep the higher-scored highlight
-                    if highlight["score"] > existing["score"]:
-                        filtered.remove(existing)
-                        break
-                    else:
-                        is_overlapping = True
-                        break
+            idx = bisect.bisect_left(kept_starts, highlight["end"]) - 1
+            if idx >= 0 and filtered[idx]["end"] > highlight["start"]:
+                continue
             
-            if not is_overlapping:
-                filtered.append(highlight)
+            insert_at = idx + 1
+            kept_starts.insert(insert_at, highlight["start"])
+            filtered.insert(insert_at, highlight)
         
         # Ensure temporal coherence (highlights should flow logically)
         return self._ensure_temporal_coherence(filtered)
     
-    def _highlights_overlap(self, h1: Dict, h2: Dict) -> bool:
-        """Check if two highlights overlap in time."""
-        return not (h1["end"] <= h2["start"] or h2["end"] <= h1["start"])
-    
     def _ensure_temporal_coherence(self, highlights: List[Dict]) -> List[Dict]:
         """Ensure highlights are in temporal order and have good spacing."""
         # Sort by start time
-        highlights.sort(key=lambda x: x["start"])
+        highlights.sort(key=itemgetter("start"))
+        if not highlights:
+            return highlights
         
         # Remove highlights that are too close together (less than 5 seconds apart)
         filtered = []
@@ -424,52 +868,38 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
         
         return filtered
     
-    def _clamp_to_segments(self, start: float, end: float, segments: List[Dict]) -> tuple:
+    def _clamp_to_segments(self, start: float, end: float, segments: List[Dict],
+                           starts: array, ends: array) -> tuple:
         """Clamp highlight times to valid segment boundaries."""
-        start_segment, end_segment = self._find_containing_segments(start, end, segments)
-        
-        # If we can't find containing segments, clamp to nearest
-        if not start_segment:
-            start_segment = self._find_nearest_start_segment(start, segments)
-        if not end_segment:
-            end_segment = self._find_nearest_end_segment(end, segments)
+        start_segment, end_segment = self._find_boundary_segments(start, end, segments, starts, ends)
         
         # Clamp to segment boundaries
         if start_segment and end_segment:
             return self._clamp_to_boundaries(start, end, start_segment, end_segment)
         return start, end
     
-    def _find_containing_segments(self, start: float, end: float, segments: List[Dict]) -> tuple:
-        """Find segments that contain the start and end times."""
-        start_segment = None
-        end_segment = None
+    def _find_boundary_segments(self, start: float, end: float, segments: List[Dict],
+                                starts: array, ends: array) -> tuple:
+        """Find the segments to clamp a highlight's start and end to.
+        
+        The start segment is the last one starting at or before the start time, which
+        is both the containing segment and the nearest fallback. The end segment is the
+        one containing the end time, else whichever segment end is closest to it (so
+        highlights ending past the transcript are still clamped to the last segment).
+        """
+        idx = bisect.bisect_right(starts, start) - 1
+        start_segment = segments[idx] if idx >= 0 else None
         
-        for seg in segments:
-            if seg["start"] <= start <= seg["end"]:
-                start_segment = seg
-            if seg["start"] <= end <= seg["end"]:
-                end_segment = seg
+        idx = bisect.bisect_right(starts, end) - 1
+        if idx < 0 or ends[idx] < end:
+            # Nearest segment end: first one at or after the end time, or the one before it
+            idx = min(bisect.bisect_left(ends, end), len(segments) - 1)
+            if idx > 0 and abs(ends[idx - 1] - end) < abs(ends[idx] - end):
+                idx -= 1
+        end_segment = segments[idx] if idx >= 0 else None
         
         return start_segment, end_segment
     
-    def _find_nearest_start_segment(self, start: float, segments: List[Dict]) -> Optional[Dict]:
-        """Find the nearest segment for the start time."""
-        for seg in segments:
-            if seg["start"] <= start:
-                return seg
-            else:
-                break
-        return None
-    
-    def _find_nearest_end_segment(self, end: float, segments: List[Dict]) -> Optional[Dict]:
-        """Find the nearest segment for the end time."""
-        for seg in reversed(segments):
-            if seg["end"] >= end:
-                return seg
-            else:
-                break
-        return None
-    
     def _clamp_to_boundaries(self, start: float, end: float, start_segment: Dict, end_segment: Dict) -> tuple:
         """Clamp times to segment boundaries."""
         if start_segment:
@@ -480,14 +910,22 @@ Remember: You're creating a mini-documentary that tells the complete story in {t
         return start, end
     
     async def test_connection(self) -> bool:
-        """Test if the LLM service is accessible."""
+        """Test if the LLM service is accessible (for health checks, not used per ranking)."""
+        # Reuse a recent probe result instead of paying another completion round-trip
+        now = time.monotonic()
+        if self._last_probe_ts is not None and now - self._last_probe_ts < self.connection_probe_ttl:
+            return self._last_probe_ok
+        
         try:
             await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=5
             )
-            return True
+            self._last_probe_ok = True
         except Exception as e:
             logger.error(f"LLM connection test failed: {str(e)}")
-            return False
+            self._last_probe_ok = False
+        
+        self._last_probe_ts = now
+        return self._last_probe_ok
@@ -13,20 +13,25 @@ for different video formats and codecs.
 """
 
 import os
+import json
 import logging
 import subprocess
 import asyncio
 import tempfile
-import aiofiles
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-def _create_temp_file(suffix: str, mode: str = 'w') -> str:
-    """Create a temporary file and return its path."""
-    with tempfile.NamedTemporaryFile(mode=mode, suffix=suffix, delete=False) as tmp_file:
-        return tmp_file.name
+def _create_temp_file(suffix: str, content: bytes = b"") -> str:
+    """Create a temporary file (optionally with initial content) and return its path."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        if content:
+            os.write(fd, content)
+    finally:
+        os.close(fd)
+    return path
 
 # Constants for FFmpeg options
 FASTSTART_FLAG = "+faststart"
@@ -34,6 +39,121 @@ H264_CODEC = "libx264"
 AAC_CODEC = "aac"
 VERYFAST_PRESET = "veryfast"
 CRF_QUALITY = "23"
+FASTDECODE_TUNE = "fastdecode"
+
+# Software H.264 encode options tuned for speed
+LIBX264_ENCODE_ARGS = (
+    "-c:v", H264_CODEC,
+    "-preset", VERYFAST_PRESET,
+    "-tune", FASTDECODE_TUNE,
+    "-crf", CRF_QUALITY
+)
+
+# Single-frame JPEG output shared by both thumbnail strategies
+THUMBNAIL_OUTPUT_ARGS = (
+    "-an",                       # Skip audio decoding
+    "-vframes", "1",             # Extract only 1 frame
+    "-c:v", "mjpeg",             # Use MJPEG codec for JPEG output
+    "-q:v", "2",                 # High quality (1-31, lower = better)
+    "-y"                         # Overwrite output file
+)
+
+# Hardware H.264 encoders in order of preference (NVIDIA, macOS, Intel)
+HW_H264_ENCODERS = ("h264_nvenc", "h264_videotoolbox", "h264_qsv")
+
+# Rate control per hardware encoder, matching libx264 CRF 23 quality where supported
+HW_ENCODER_OPTIONS = {
+    "h264_nvenc": ["-preset", "p4", "-rc", "vbr", "-cq", CRF_QUALITY, "-b:v", "0"],
+}
+
+# FFmpeg stderr kept for error messages (the tail holds the actual error)
+FFMPEG_STDERR_TAIL_BYTES = 64 * 1024
+
+# Most segments joined in a single concat-filter pass (each one is a separate FFmpeg input)
+MAX_CONCAT_FILTER_INPUTS = 64
+
+# Encoder chosen by the one-time probe, shared by all renderers in this process
+_video_encoder: Optional[str] = None
+
+# Whether FFmpeg was built with libsoxr, probed once per process
+_soxr_available: Optional[bool] = None
+
+async def _run_probe(cmd: List[str]) -> tuple:
+    """Run a short probe command and return (returncode, stdout)."""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    return process.returncode, stdout.decode(errors="ignore")
+
+async def detect_video_encoder(ffmpeg_path: str = "ffmpeg") -> str:
+    """
+    Pick the fastest working H.264 encoder, probing FFmpeg once per process.
+    
+    Hardware encoders are only chosen if FFmpeg lists them and a tiny test
+    encode succeeds, since builds often ship encoders without the matching
+    device or driver. Falls back to libx264 when none work.
+    
+    Args:
+        ffmpeg_path: Path to ffmpeg executable
+        
+    Returns:
+        str: FFmpeg video encoder name
+    """
+    global _video_encoder
+    if _video_encoder is not None:
+        return _video_encoder
+    
+    _video_encoder = H264_CODEC
+    try:
+        returncode, encoders = await _run_probe([ffmpeg_path, "-hide_banner", "-encoders"])
+        if returncode == 0:
+            for encoder in HW_H264_ENCODERS:
+                if encoder not in encoders:
+                    continue
+                returncode, _ = await _run_probe([
+                    ffmpeg_path, "-hide_banner",
+                    "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                    "-c:v", encoder,
+                    *HW_ENCODER_OPTIONS.get(encoder, []),
+                    "-f", "null", "-"
+                ])
+                if returncode == 0:
+                    _video_encoder = encoder
+                    break
+    except Exception as e:
+        logger.warning(f"Video encoder probe failed, using {H264_CODEC}: {str(e)}")
+    
+    logger.info(f"Using video encoder: {_video_encoder}")
+    return _video_encoder
+
+async def detect_soxr_resampler(ffmpeg_path: str = "ffmpeg") -> bool:
+    """
+    Check whether FFmpeg can resample with libsoxr, probing once per process.
+    
+    The SoX resampler is faster than the default swresample for the
+    48kHz -> 16kHz conversion Whisper needs, but is an optional build flag.
+    
+    Args:
+        ffmpeg_path: Path to FFmpeg executable
+        
+    Returns:
+        True if the aresample filter accepts resampler=soxr
+    """
+    global _soxr_available
+    if _soxr_available is not None:
+        return _soxr_available
+    
+    _soxr_available = False
+    try:
+        returncode, buildconf = await _run_probe([ffmpeg_path, "-hide_banner", "-buildconf"])
+        _soxr_available = returncode == 0 and "--enable-libsoxr" in buildconf
+    except Exception as e:
+        logger.warning(f"FFmpeg build probe failed, using default resampler: {str(e)}")
+    
+    return _soxr_available
 
 class VideoRenderer:
     """
@@ -60,8 +180,14 @@ class VideoRenderer:
         """
         self.ffmpeg_path = ffmpeg_path
         self.ffprobe_path = ffprobe_path
+        self._probe_cache: Dict[tuple, Dict[str, Any]] = {}  # (path, mtime_ns, size) -> ffprobe metadata
+        # Segment encodes run as separate FFmpeg processes, split across the cores
+        cpu_count = os.cpu_count() or 1
+        self.max_parallel_encodes = max(1, min(4, cpu_count // 2))
+        self.threads_per_encode = max(1, cpu_count // self.max_parallel_encodes)
     
-    async def export_concat(self, input_video: str, segments: List[Dict], out_path: str) -> str:
+    async def export_concat(self, input_video: str, segments: List[Dict], out_path: str,
+                            video_encoder: Optional[str] = None) -> str:
         """
         Export concatenated video from segments with robust error handling.
         
@@ -69,6 +195,8 @@ class VideoRenderer:
             input_video: Path to input video file
             segments: List of segments with start, end, label
             out_path: Output path for the concatenated video
+            video_encoder: FFmpeg video encoder to use for re-encoding
+                           (default: libx264, see detect_video_encoder)
             
         Returns:
             Path to the output video file
@@ -82,37 +210,38 @@ class VideoRenderer:
             
             if len(segments) <= 1:
                 # Single segment - just copy that range
-                return await self._export_single_segment(input_video, segments[0], out_path)
+                return await self._export_single_segment(input_video, segments[0], out_path, video_encoder)
             else:
                 # Multiple segments - use concat method
-                return await self._export_multiple_segments(input_video, segments, out_path)
+                return await self._export_multiple_segments(input_video, segments, out_path, video_encoder)
                 
         except Exception as e:
             logger.error(f"Video export failed: {str(e)}")
             raise
     
-    async def _export_single_segment(self, input_video: str, segment: Dict, out_path: str) -> str:
+    async def _export_single_segment(self, input_video: str, segment: Dict, out_path: str,
+                                     video_encoder: Optional[str] = None) -> str:
         """Export a single segment with re-encoding."""
         try:
             start = segment["start"]
             end = segment["end"]
             duration = end - start
             
-            cmd = [
-                self.ffmpeg_path,
-                "-i", input_video,
-                "-ss", str(start),
-                "-t", str(duration),
-                "-c:v", "libx264",
-                "-preset", "veryfast",
-                "-crf", "23",
-                "-c:a", "aac",
-                "-movflags", FASTSTART_FLAG,
-                "-y",
-                out_path
-            ]
+            def build_cmd(encoder: Optional[str]) -> List[str]:
+                return [
+                    self.ffmpeg_path,
+                    *self._hwaccel_args(encoder),
+                    "-ss", str(start),  # Input seeking: jump to the nearest keyframe instead of decoding from 0
+                    "-i", input_video,
+                    "-t", str(duration),
+                    *self._video_encode_args(encoder),
+                    "-c:a", "aac",
+                    "-movflags", FASTSTART_FLAG,
+                    "-y",
+                    out_path
+                ]
             
-            await self._run_ffmpeg(cmd)
+            await self._run_encode(build_cmd, video_encoder)
             logger.info(f"Single segment exported: {out_path}")
             return out_path
             
@@ -120,30 +249,53 @@ class VideoRenderer:
             logger.error(f"Single segment export failed: {str(e)}")
             raise
     
-    async def _export_multiple_segments(self, input_video: str, segments: List[Dict], out_path: str) -> str:
+    async def _export_multiple_segments(self, input_video: str, segments: List[Dict], out_path: str,
+                                        video_encoder: Optional[str] = None) -> str:
         """Export multiple segments using concat method."""
+        # Fast path: one FFmpeg process trims and joins all segments without intermediate files
+        if len(segments) <= MAX_CONCAT_FILTER_INPUTS:
+            try:
+                await self._export_concat_filter(input_video, segments, out_path, video_encoder)
+                logger.info(f"Concatenated with concat filter: {out_path}")
+                return out_path
+            except RuntimeError as e:
+                logger.warning(f"Concat filter export failed, falling back to per-segment encode: {str(e)}")
+        
         try:
-            # First, re-encode each segment
+            # First, re-encode each segment (independent processes, run in parallel)
             temp_segments = []
+            semaphore = asyncio.Semaphore(self.max_parallel_encodes)
             
-            for i, segment in enumerate(segments):
-                temp_path = await self._reencode_segment(input_video, segment, i)
-                temp_segments.append(temp_path)
+            async def reencode_bounded(i: int, segment: Dict) -> str:
+                async with semaphore:
+                    return await self._reencode_segment(
+                        input_video, segment, i, video_encoder, self.threads_per_encode
+                    )
             
-            # Create concat file
-            concat_file = await self._create_concat_file(temp_segments)
+            results = await asyncio.gather(
+                *(reencode_bounded(i, segment) for i, segment in enumerate(segments)),
+                return_exceptions=True
+            )
+            
+            # Keep every file that was written so cleanup still runs if one segment failed
+            temp_segments = [result for result in results if isinstance(result, str)]
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
             
             try:
                 # Try stream copy first (fastest)
-                success = await self._concat_with_copy(concat_file, out_path)
+                success = await self._concat_with_copy(temp_segments, out_path)
                 if success:
                     logger.info(f"Concatenated with stream copy: {out_path}")
                     return out_path
             except Exception as e:
                 logger.warning(f"Stream copy failed, falling back to re-encode: {str(e)}")
             
-            # Fallback to re-encoding
-            await self._concat_with_reencode(concat_file, out_path)
+            # Fallback to re-encoding through the concat demuxer
+            concat_file = await self._create_concat_file(temp_segments)
+            temp_segments.append(concat_file)
+            await self._concat_with_reencode(concat_file, out_path, video_encoder)
             logger.info(f"Concatenated with re-encode: {out_path}")
             return out_path
             
@@ -154,31 +306,63 @@ class VideoRenderer:
             # Clean up temporary files
             self._cleanup_temp_files(temp_segments)
     
-    async def _reencode_segment(self, input_video: str, segment: Dict, index: int) -> str:
-        """Re-encode a single segment with specified settings."""
+    async def _export_concat_filter(self, input_video: str, segments: List[Dict], out_path: str,
+                                    video_encoder: Optional[str] = None) -> None:
+        """Trim every segment as its own seeked input and join them with the concat filter."""
+        inputs = []
+        for segment in segments:
+            inputs += [
+                "-ss", str(segment["start"]),
+                "-t", str(segment["end"] - segment["start"]),
+                "-i", input_video
+            ]
+        streams = "".join(f"[{i}:v:0][{i}:a:0]" for i in range(len(segments)))
+        filter_graph = f"{streams}concat=n={len(segments)}:v=1:a=1[v][a]"
+        
+        def build_cmd(encoder: Optional[str]) -> List[str]:
+            # No GPU-resident decode here: the concat filter needs frames in system memory
+            return [
+                self.ffmpeg_path,
+                *inputs,
+                "-filter_complex", filter_graph,
+                "-map", "[v]",
+                "-map", "[a]",
+                *self._video_encode_args(encoder),
+                "-c:a", "aac",
+                "-movflags", FASTSTART_FLAG,
+                "-y",
+                out_path
+            ]
+        
+        await self._run_encode(build_cmd, video_encoder)
+    
+    async def _reencode_segment(self, input_video: str, segment: Dict, index: int,
+                                video_encoder: Optional[str] = None, threads: Optional[int] = None) -> str:
+        """Re-encode a single segment with specified settings (threads caps FFmpeg's thread pool)."""
         start = segment["start"]
         end = segment["end"]
         duration = end - start
         
-        # Create temporary file for this segment
-        temp_path = _create_temp_file(f"_seg_{index}.mp4")
+        # Create temporary file for this segment (MPEG-TS so segments join by byte concatenation)
+        temp_path = _create_temp_file(f"_seg_{index}.ts")
         
-        try:
-            cmd = [
+        def build_cmd(encoder: Optional[str]) -> List[str]:
+            return [
                 self.ffmpeg_path,
+                *self._hwaccel_args(encoder),
+                "-ss", str(start),  # Input seeking: jump to the nearest keyframe instead of decoding from 0
                 "-i", input_video,
-                "-ss", str(start),
                 "-t", str(duration),
-                "-c:v", "libx264",
-                "-preset", "veryfast",
-                "-crf", "23",
+                *self._video_encode_args(encoder),
+                *(["-threads", str(threads)] if threads else []),
                 "-c:a", "aac",
-                "-movflags", FASTSTART_FLAG,
+                "-f", "mpegts",
                 "-y",
                 temp_path
             ]
-            
-            await self._run_ffmpeg(cmd)
+        
+        try:
+            await self._run_encode(build_cmd, video_encoder)
             return temp_path
             
         except Exception:
@@ -191,22 +375,20 @@ class VideoRenderer:
     
     async def _create_concat_file(self, segment_paths: List[str]) -> str:
         """Create FFmpeg concat file."""
-        concat_file = _create_temp_file('.txt', 'w')
-        async with aiofiles.open(concat_file, 'w') as f:
-            for path in segment_paths:
-                await f.write(f"file '{path}'\n")
-        
-        return concat_file
+        # A few hundred bytes, written through the descriptor that created the file
+        content = "".join(f"file '{path}'\n" for path in segment_paths)
+        return _create_temp_file('.txt', content.encode("utf-8"))
     
-    async def _concat_with_copy(self, concat_file: str, out_path: str) -> bool:
+    async def _concat_with_copy(self, segment_paths: List[str], out_path: str) -> bool:
         """Try concatenation with stream copy (fastest)."""
         try:
+            # MPEG-TS segments are read back-to-back as one stream by the concat protocol
             cmd = [
                 self.ffmpeg_path,
-                "-f", "concat",
-                "-safe", "0",
-                "-i", concat_file,
+                "-i", "concat:" + "|".join(segment_paths),
                 "-c", "copy",
+                "-bsf:a", "aac_adtstoasc",  # ADTS (TS) to MP4-style AAC headers
+                "-movflags", FASTSTART_FLAG,
                 "-y",
                 out_path
             ]
@@ -218,31 +400,63 @@ class VideoRenderer:
             logger.warning(f"Stream copy concat failed: {str(e)}")
             return False
     
-    async def _concat_with_reencode(self, concat_file: str, out_path: str) -> None:
+    async def _concat_with_reencode(self, concat_file: str, out_path: str,
+                                    video_encoder: Optional[str] = None) -> None:
         """Concatenate with re-encoding (fallback)."""
-        cmd = [
-            self.ffmpeg_path,
-            "-f", "concat",
-            "-safe", "0",
-            "-i", concat_file,
-            "-c:v", "libx264",
-            "-preset", "veryfast",
-            "-crf", "23",
-            "-c:a", "aac",
-            "-movflags", "+faststart",
-            "-y",
-            out_path
-        ]
+        def build_cmd(encoder: Optional[str]) -> List[str]:
+            return [
+                self.ffmpeg_path,
+                *self._hwaccel_args(encoder),
+                "-f", "concat",
+                "-safe", "0",
+                "-i", concat_file,
+                *self._video_encode_args(encoder),
+                "-c:a", "aac",
+                "-movflags", "+faststart",
+                "-y",
+                out_path
+            ]
         
-        await self._run_ffmpeg(cmd)
+        await self._run_encode(build_cmd, video_encoder)
+    
+    async def _run_encode(self, build_cmd: Callable[[Optional[str]], List[str]],
+                          video_encoder: Optional[str]) -> None:
+        """Run an encode, retrying with libx264 if the hardware encoder fails on this input."""
+        try:
+            await self._run_ffmpeg(build_cmd(video_encoder))
+        except RuntimeError as e:
+            if not self._is_hardware_encoder(video_encoder):
+                raise
+            logger.warning(f"{video_encoder} encode failed, retrying with {H264_CODEC}: {str(e)}")
+            await self._run_ffmpeg(build_cmd(None))
+    
+    def _is_hardware_encoder(self, video_encoder: Optional[str]) -> bool:
+        """Check if the encoder is a hardware encoder rather than libx264."""
+        return bool(video_encoder) and video_encoder != H264_CODEC
+    
+    def _hwaccel_args(self, video_encoder: Optional[str]) -> List[str]:
+        """Input options enabling hardware decoding alongside a hardware encoder."""
+        if video_encoder == "h264_nvenc":
+            # Decode on the GPU and keep frames in GPU memory for NVENC (no filters in between)
+            return ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+        if self._is_hardware_encoder(video_encoder):
+            return ["-hwaccel", "auto"]
+        return []
+    
+    def _video_encode_args(self, video_encoder: Optional[str]) -> List[str]:
+        """Output video codec options for the chosen encoder."""
+        if self._is_hardware_encoder(video_encoder):
+            return ["-c:v", str(video_encoder), *HW_ENCODER_OPTIONS.get(video_encoder, [])]
+        # Software fallback tuned for speed
+        return list(LIBX264_ENCODE_ARGS)
     
     async def make_thumbnail(self, input_video: str, t: float, out_path: str) -> str:
         """
         Create a thumbnail at time t with robust error handling.
         
         This method uses a two-tier approach for thumbnail generation:
-        1. First attempts optimized method with MJPEG encoding
-        2. Falls back to re-encoding if the first method fails
+        1. First seeks the input to t (fast, only decodes from the nearest keyframe)
+        2. Falls back to decoding up to t if the file doesn't seek cleanly
         
         The method ensures proper JPEG format output that can be opened
         by standard image viewers and web browsers.
@@ -262,29 +476,29 @@ class VideoRenderer:
             # Ensure output directory exists to prevent file creation errors
             Path(out_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # First try optimized method with MJPEG encoding (fastest and most reliable)
-            success = await self._thumbnail_with_copy(input_video, t, out_path)
+            # First try input seeking (fastest)
+            success = await self._thumbnail_with_input_seek(input_video, t, out_path)
             if success:
-                logger.info(f"Thumbnail created with optimized method: {out_path}")
+                logger.info(f"Thumbnail created with input seeking: {out_path}")
                 return out_path
             
-            # Fallback to re-encoding method if optimized approach fails
-            # This handles edge cases with certain video formats or codecs
-            await self._thumbnail_with_reencode(input_video, t, out_path)
-            logger.info(f"Thumbnail created with re-encode fallback: {out_path}")
+            # Fallback to output seeking if input seeking fails
+            # This handles files with missing or broken seek indexes
+            await self._thumbnail_with_output_seek(input_video, t, out_path)
+            logger.info(f"Thumbnail created with output seeking fallback: {out_path}")
             return out_path
             
         except Exception as e:
             logger.error(f"Thumbnail creation failed: {str(e)}")
             raise
     
-    async def _thumbnail_with_copy(self, input_video: str, t: float, out_path: str) -> bool:
+    async def _thumbnail_with_input_seek(self, input_video: str, t: float, out_path: str) -> bool:
         """
-        Try thumbnail creation with optimized MJPEG settings.
+        Try thumbnail creation by seeking the input before decoding.
         
-        This method uses MJPEG encoding which is specifically designed for
-        JPEG image output. It's faster than re-encoding and produces
-        high-quality thumbnails that are compatible with all image viewers.
+        FFmpeg jumps to the keyframe before t and only decodes from there,
+        then encodes the frame with MJPEG, which produces high-quality
+        thumbnails that are compatible with all image viewers.
         
         Args:
             input_video: Path to input video file
@@ -297,13 +511,9 @@ class VideoRenderer:
         try:
             cmd = [
                 self.ffmpeg_path,
+                "-ss", str(t),               # Input seeking: jump to the nearest keyframe, no decode from 0
                 "-i", input_video,           # Input video file
-                "-ss", str(t),               # Seek to specific time
-                "-vframes", "1",             # Extract only 1 frame
-                "-f", "image2",              # Force image format output
-                "-c:v", "mjpeg",             # Use MJPEG codec for JPEG output
-                "-q:v", "2",                 # High quality (1-31, lower = better)
-                "-y",                        # Overwrite output file
+                *THUMBNAIL_OUTPUT_ARGS,
                 out_path
             ]
             
@@ -311,20 +521,16 @@ class VideoRenderer:
             return True
             
         except Exception as e:
-            logger.warning(f"Optimized thumbnail creation failed: {str(e)}")
+            logger.warning(f"Input-seek thumbnail creation failed: {str(e)}")
             return False
     
-    async def _thumbnail_with_reencode(self, input_video: str, t: float, out_path: str) -> None:
-        """Create thumbnail with re-encoding (fallback)."""
+    async def _thumbnail_with_output_seek(self, input_video: str, t: float, out_path: str) -> None:
+        """Create thumbnail by decoding up to t (fallback for files that don't seek cleanly)."""
         cmd = [
             self.ffmpeg_path,
             "-i", input_video,
             "-ss", str(t),
-            "-vframes", "1",
-            "-f", "image2",
-            "-c:v", "mjpeg",
-            "-q:v", "2",
-            "-y",
+            *THUMBNAIL_OUTPUT_ARGS,
             out_path
         ]
         
@@ -336,14 +542,19 @@ class VideoRenderer:
             logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
             process = await asyncio.create_subprocess_exec(
                 *cmd,
-                stdout=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            _, stderr = await process.communicate()
+            # Drain stderr while FFmpeg runs, keeping only the tail for error messages
+            # (progress output on long encodes would otherwise pile up in memory)
+            stderr, _ = await asyncio.gather(
+                self._read_stderr_tail(process.stderr),
+                process.wait()
+            )
             
             if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
+                error_msg = stderr.decode(errors="replace") if stderr else "Unknown FFmpeg error"
                 raise RuntimeError(f"FFmpeg failed (exit code {process.returncode}): {error_msg}")
                 
         except FileNotFoundError:
@@ -352,6 +563,18 @@ class VideoRenderer:
             logger.error(f"FFmpeg execution failed: {str(e)}")
             raise
     
+    async def _read_stderr_tail(self, stream: asyncio.StreamReader) -> bytes:
+        """Read a stream to EOF, returning only its last FFMPEG_STDERR_TAIL_BYTES bytes."""
+        tail = bytearray()
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                break
+            tail += chunk
+            if len(tail) > FFMPEG_STDERR_TAIL_BYTES:
+                del tail[:-FFMPEG_STDERR_TAIL_BYTES]
+        return bytes(tail)
+    
     def _cleanup_temp_files(self, temp_files: List[str]) -> None:
         """Clean up temporary files."""
         for temp_file in temp_files:
@@ -362,33 +585,52 @@ class VideoRenderer:
                 logger.warning(f"Failed to cleanup temp file {temp_file}: {str(e)}")
     
     async def get_video_duration(self, video_path: str) -> float:
-        """Get video duration using ffprobe."""
+        """Get video duration using ffprobe (cached per file version)."""
         try:
-            cmd = [
-                self.ffprobe_path,
-                "-v", "quiet",
-                "-show_entries", "format=duration",
-                "-of", "csv=p=0",
-                video_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                raise RuntimeError(f"ffprobe failed: {stderr.decode()}")
-            
-            return float(stdout.decode().strip())
+            metadata = await self._probe(video_path)
+            return float(metadata["format"]["duration"])
             
         except Exception as e:
             logger.error(f"Failed to get video duration: {str(e)}")
             return 0.0
     
+    async def _probe(self, video_path: str) -> Dict[str, Any]:
+        """
+        Get ffprobe format and stream metadata for a file, probing each file version once.
+        
+        Results are keyed by path, modification time and size, so a file that is
+        rewritten (e.g. a re-rendered highlights video) is probed again.
+        """
+        stat = os.stat(video_path)
+        cache_key = (video_path, stat.st_mtime_ns, stat.st_size)
+        metadata = self._probe_cache.get(cache_key)
+        if metadata is not None:
+            return metadata
+        
+        cmd = [
+            self.ffprobe_path,
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            video_path
+        ]
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        stdout, stderr = await process.communicate()
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"ffprobe failed: {stderr.decode()}")
+        
+        metadata = json.loads(stdout)
+        self._probe_cache[cache_key] = metadata
+        return metadata
+    
     async def test_ffmpeg(self) -> bool:
         """Test if FFmpeg is available and working."""
         try:
@@ -5,8 +5,8 @@ This module defines the core database models for the video summarization service
 including user authentication, job tracking, and file management.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 from enum import Enum
@@ -68,6 +68,13 @@ class Job(Base):
     """
     __tablename__ = "jobs"
     
+    # Indexes for the job list (a user's jobs, newest first, optionally filtered by status);
+    # btrees are scanned backwards for created_at DESC
+    __table_args__ = (
+        Index("ix_jobs_user_created", "user_id", "created_at"),
+        Index("ix_jobs_user_status_created", "user_id", "status", "created_at"),
+    )
+    
     # Primary key and foreign key relationships
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Owner of this job
@@ -77,15 +84,17 @@ class Job(Base):
     target_seconds = Column(Integer, nullable=False)  # Desired summary duration
     status = Column(SQLEnum(JobStatus), default=JobStatus.UPLOADED, nullable=False)  # Current processing state
     
-    # File paths - stored as strings to allow for flexible storage locations
-    input_file_path = Column(String(500), nullable=True)  # Original uploaded video
-    audio_file_path = Column(String(500), nullable=True)  # Extracted audio track
-    transcript_file_path = Column(String(500), nullable=True)  # JSON transcript data
-    transcript_srt_path = Column(String(500), nullable=True)  # SRT subtitle file
-    highlights_file_path = Column(String(500), nullable=True)  # Final highlight video
-    thumbnail_file_path = Column(String(500), nullable=True)  # Video thumbnail image
-    jump_to_file_path = Column(String(500), nullable=True)  # Timestamp mapping for navigation
-    result_file_path = Column(String(500), nullable=True)  # Processing result metadata
+    # File paths - stored as strings to allow for flexible storage locations.
+    # Deferred as one group: job listings never read them, and the first access
+    # on a loaded job fetches all eight together
+    input_file_path = deferred(Column(String(500), nullable=True), group="files")  # Original uploaded video
+    audio_file_path = deferred(Column(String(500), nullable=True), group="files")  # Extracted audio track
+    transcript_file_path = deferred(Column(String(500), nullable=True), group="files")  # JSON transcript data
+    transcript_srt_path = deferred(Column(String(500), nullable=True), group="files")  # SRT subtitle file
+    highlights_file_path = deferred(Column(String(500), nullable=True), group="files")  # Final highlight video
+    thumbnail_file_path = deferred(Column(String(500), nullable=True), group="files")  # Video thumbnail image
+    jump_to_file_path = deferred(Column(String(500), nullable=True), group="files")  # Timestamp mapping for navigation
+    result_file_path = deferred(Column(String(500), nullable=True), group="files")  # Processing result metadata
     
     # Processing metadata
     original_filename = Column(String(255), nullable=True)  # Name of uploaded file
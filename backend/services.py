@@ -6,13 +6,21 @@ operations for users and jobs. It provides a clean interface between
 the API endpoints and the database models.
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from typing import Optional, List
 from backend.schemas import User, Job, JobStatus
 from backend.models import UserCreate, UserLogin, UserUpdate, UserDelete, JobCreate, JobUpdate, JobDelete, JobResponse, JobListQuery
 from backend.auth import hash_password, verify_password
+from functools import lru_cache
 import os
 
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Hash checked on unknown emails so failed logins cost the same either way."""
+    return hash_password("not-a-real-password")
+
+
 # =============================================================================
 # USER SERVICE - Handles user authentication and profile management
 # =============================================================================
@@ -63,9 +71,10 @@ class UserService:
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        # Use explicit query to avoid any LIMIT/OFFSET issues
+        # Primary-key lookup: served from the session's identity map when the
+        # user was already loaded in this request (e.g. by get_current_user)
         try:
-            return db.query(User).filter(User.id == user_id).one_or_none()
+            return db.get(User, user_id)
         except Exception:
             # Fallback to raw SQL if ORM query fails
             from sqlalchemy import text
@@ -84,12 +93,25 @@ class UserService:
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate a user."""
         user = UserService.get_user_by_email(db, email)
-        if not user:
-            return None
-        if not verify_password(password, str(user.hashed_password)):
+        hashed_password = str(user.hashed_password) if user else None
+        if not UserService.check_password(password, hashed_password):
             return None
         return user
     
+    @staticmethod
+    def check_password(password: str, hashed_password: Optional[str]) -> bool:
+        """
+        Verify a password against a stored hash without touching the database.
+        
+        Safe to run in a worker thread. When hashed_password is None (unknown
+        email) a dummy hash is still checked, so response time doesn't reveal
+        whether the email is registered.
+        """
+        if hashed_password is None:
+            verify_password(password, _dummy_password_hash())
+            return False
+        return verify_password(password, hashed_password)
+    
     @staticmethod
     def update_user(db: Session, user_id: int, user_data: UserUpdate) -> Optional[User]:
         """Update user profile."""
@@ -103,17 +125,14 @@ class UserService:
             if existing_user:
                 raise ValueError("Email already registered")
         
-        # Update fields using SQLAlchemy update
-        update_data = {}
+        # Set fields on the loaded instance so the flush issues a single
+        # UPDATE; expired attributes reload lazily, so no explicit refresh
         if user_data.full_name is not None:
-            update_data['full_name'] = user_data.full_name
+            user.full_name = user_data.full_name  # type: ignore
         if user_data.email is not None:
-            update_data['email'] = user_data.email
+            user.email = user_data.email  # type: ignore
         
-        if update_data:
-            db.query(User).filter(User.id == user_id).update(update_data)
         db.commit()
-        db.refresh(user)
         return user
     
     @staticmethod
@@ -170,12 +189,40 @@ class JobService:
     
     @staticmethod
     def get_job_by_id(db: Session, job_id: int) -> Optional[Job]:
-        """Get job by ID."""
-        return db.query(Job).filter(Job.id == job_id).first()
+        """Get job by ID (identity-map aware primary-key lookup)."""
+        return db.get(Job, job_id)
     
     @staticmethod
     def get_user_jobs(db: Session, user_id: int, query_params: Optional[JobListQuery] = None) -> List[Job]:
         """Get all jobs for a user with optional filtering and pagination."""
+        return JobService._user_jobs_query(db, user_id, query_params).all()
+    
+    @staticmethod
+    def get_user_jobs_with_urls(db: Session, user_id: int, query_params: Optional[JobListQuery] = None) -> List[JobResponse]:
+        """
+        List a user's jobs as responses with computed file URLs.
+        
+        Loads the output path columns in the listing query itself, so building
+        URLs doesn't trigger a deferred-column SELECT per job.
+        
+        Args:
+            db: Database session
+            user_id: ID of the user whose jobs to list
+            query_params: Optional search, status filter and pagination
+            
+        Returns:
+            List[JobResponse]: Jobs, newest first, with URLs filled in
+        """
+        jobs = JobService._user_jobs_query(db, user_id, query_params).options(
+            undefer(Job.highlights_file_path),
+            undefer(Job.thumbnail_file_path),
+            undefer(Job.transcript_srt_path)
+        ).all()
+        return [JobService._job_response_with_urls(job) for job in jobs]
+    
+    @staticmethod
+    def _user_jobs_query(db: Session, user_id: int, query_params: Optional[JobListQuery] = None):
+        """Build the filtered, ordered and paginated query behind job listings."""
         query = db.query(Job).filter(Job.user_id == user_id)
         
         if query_params:
@@ -200,7 +247,7 @@ class JobService:
             if query_params.limit:
                 query = query.limit(query_params.limit)
         
-        return query.all()
+        return query
     
     @staticmethod
     def update_job(db: Session, job_id: int, user_id: int, job_data: JobUpdate) -> Optional[Job]:
@@ -209,17 +256,13 @@ class JobService:
         if not job:
             return None
         
-        # Update fields using SQLAlchemy update
-        update_data = {}
+        # Set fields on the loaded instance so the flush issues a single UPDATE
         if job_data.title is not None:
-            update_data['title'] = job_data.title
+            job.title = job_data.title  # type: ignore
         if job_data.target_seconds is not None:
-            update_data['target_seconds'] = job_data.target_seconds
+            job.target_seconds = job_data.target_seconds  # type: ignore
         
-        if update_data:
-            db.query(Job).filter(Job.id == job_id).update(update_data)
         db.commit()
-        db.refresh(job)
         return job
     
     @staticmethod
@@ -291,7 +334,6 @@ class JobService:
             })
         
         db.commit()
-        db.refresh(job)
         return job
     
     @staticmethod
@@ -304,15 +346,55 @@ class JobService:
         # Update file paths using SQLAlchemy update
         update_data = {}
         for field, path in file_paths.items():
-            if hasattr(job, field):
+            if hasattr(Job, field):  # Check the model, not the instance, to avoid loading deferred paths
                 update_data[field] = path
         
         if update_data:
             db.query(Job).filter(Job.id == job_id).update(update_data)
         db.commit()
-        db.refresh(job)
         return job
-    
+
+    @staticmethod
+    def update_job_bulk(
+        db: Session,
+        job_id: int,
+        status: Optional[JobStatus] = None,
+        error_message: Optional[str] = None,
+        file_paths: Optional[dict] = None
+    ) -> bool:
+        """
+        Update status, error message and file paths in a single statement.
+
+        Unlike calling update_job_status and update_job_file_paths back to
+        back, this issues one UPDATE and one commit without loading or
+        refreshing the job, so finishing a job costs a single transaction.
+
+        Args:
+            db: Database session
+            job_id: ID of the job to update
+            status: New job status, if changing
+            error_message: Error message to store alongside the status
+            file_paths: Mapping of Job path columns to new values
+
+        Returns:
+            bool: True if the job exists (or there was nothing to update)
+        """
+        update_data = {}
+        if status is not None:
+            update_data['status'] = status.value
+        if error_message:
+            update_data['error_message'] = error_message
+        for field, path in (file_paths or {}).items():
+            if hasattr(Job, field):
+                update_data[field] = path
+
+        if not update_data:
+            return True
+
+        updated = db.query(Job).filter(Job.id == job_id).update(update_data, synchronize_session=False)
+        db.commit()
+        return updated > 0
+
     @staticmethod
     def get_job_with_urls(db: Session, job_id: int) -> Optional[JobResponse]:
         """Get job with computed URLs."""
@@ -320,20 +402,39 @@ class JobService:
         if not job:
             return None
         
+        return JobService._job_response_with_urls(job)
+    
+    @staticmethod
+    def _job_response_with_urls(job: Job) -> JobResponse:
+        """Convert a job to its response model and fill in URLs for existing outputs."""
+        job_id = job.id
+        
         # Convert to response model with URLs
         job_response = JobResponse.from_orm(job)
         
-        # Compute URLs based on file paths
+        # Compute URLs based on file paths, checked against one directory scan
+        # instead of a stat per file
+        job_files = JobService._list_job_files(job_id)
+        
         highlights_path = getattr(job, 'highlights_file_path', None)
-        if highlights_path and os.path.exists(str(highlights_path)):
+        if highlights_path and os.path.basename(str(highlights_path)) in job_files:
             job_response.video_url = f"/files/{job_id}/highlights.mp4"
         
         thumbnail_path = getattr(job, 'thumbnail_file_path', None)
-        if thumbnail_path and os.path.exists(str(thumbnail_path)):
+        if thumbnail_path and os.path.basename(str(thumbnail_path)) in job_files:
             job_response.thumbnail_url = f"/files/{job_id}/thumb.jpg"
         
         transcript_path = getattr(job, 'transcript_srt_path', None)
-        if transcript_path and os.path.exists(str(transcript_path)):
+        if transcript_path and os.path.basename(str(transcript_path)) in job_files:
             job_response.srt_url = f"/files/{job_id}/transcript.srt"
         
         return job_response
+    
+    @staticmethod
+    def _list_job_files(job_id: int) -> set:
+        """Return the names of regular files in a job's directory (empty if missing)."""
+        try:
+            with os.scandir(f"data/jobs/{job_id}") as entries:
+                return {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            return set()
@@ -2,30 +2,55 @@
 Whisper transcription service with chunking support for long files.
 """
 
-import json
 import logging
 import os
 import subprocess
-import tempfile
+import threading
+import wave
 import aiofiles
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Union
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import orjson
 
 try:
+    import ctranslate2
     from faster_whisper import WhisperModel
     FASTER_WHISPER_AVAILABLE = True
 except ImportError:
     FASTER_WHISPER_AVAILABLE = False
     import whisper
 
+try:
+    from faster_whisper import BatchedInferencePipeline
+    BATCHED_INFERENCE_AVAILABLE = True
+except ImportError:
+    BATCHED_INFERENCE_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
-def _create_temp_file(suffix: str) -> str:
-    """Create a temporary file and return its path."""
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
-        return tmp_file.name
+# Short names for the fast large-model variants (faster-whisper resolves both)
+MODEL_ALIASES = {
+    "turbo": "large-v3-turbo",    # 4 decoder layers instead of 32
+    "distil": "distil-large-v3",
+}
+
+# Small and distilled/turbo models gain little from beam search, so they decode
+# greedily by default
+GREEDY_MODEL_SIZES = {"tiny", "base", "large-v3-turbo", "distil-large-v3"}
+
+# Loaded models shared across service instances, keyed by their load settings,
+# so only the first job in a process pays the model load
+_model_cache: Dict[tuple, Any] = {}
+_model_cache_lock = threading.Lock()
+
+# Whisper models expect 16kHz mono audio
+SAMPLE_RATE = 16000
+
+# Audio can be given as a file path or as decoded float32 samples at SAMPLE_RATE
+AudioInput = Union[str, np.ndarray]
 
 class Segment:
     """Simple segment class for transcription results."""
@@ -44,64 +69,111 @@ class Segment:
 class TranscriptionService:
     """Service for transcribing audio using Whisper with chunking support."""
     
-    def __init__(self, model_size: str = "tiny", device: str = "auto"):
+    def __init__(self, model_size: Optional[str] = None, device: str = "auto", num_workers: Optional[int] = None,
+                 compute_type: Optional[str] = None, beam_size: Optional[int] = None,
+                 word_timestamps: bool = False, vad_filter: bool = True, batch_size: int = 8,
+                 cpu_threads: Optional[int] = None):
         """
         Initialize the transcription service.
         
         Args:
-            model_size: Whisper model size ("tiny", "base", "small", "medium", "large")
+            model_size: Whisper model size ("tiny", "base", "small", "medium", "large",
+                        "turbo", "distil"). Defaults to "turbo" on CUDA and "tiny" on CPU
             device: Device to use ("cpu", "cuda", "auto")
+            num_workers: Chunks transcribed in parallel on long files. Defaults to
+                         one per 4 CPU cores, capped at 4; the cores are split evenly
+                         between workers (see cpu_threads). Always 1 for the
+                         openai-whisper fallback
+            compute_type: CTranslate2 compute type override. Defaults to float16 on
+                          GPUs that support it and int8 on CPU
+            beam_size: Decoding beam width. Defaults to 1 (greedy) for tiny, base,
+                       turbo and distil models and 5 otherwise
+            word_timestamps: Compute per-word timings (segments and SRT don't need them)
+            vad_filter: Skip silent regions with faster-whisper's Silero VAD
+            batch_size: 30-second windows encoded together per chunk with
+                        faster-whisper's batched pipeline; 1 decodes sequentially.
+                        Batching requires vad_filter, otherwise decoding is sequential
+            cpu_threads: CTranslate2 threads per worker on CPU. Defaults to the
+                         cores divided among workers, so parallel chunks don't
+                         oversubscribe the machine
         """
-        self.model_size = model_size
+        self.model_size = MODEL_ALIASES.get(model_size, model_size) if model_size else None
         self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size  # Resolved with the model size when the model loads
+        self.word_timestamps = word_timestamps
+        self.vad_filter = vad_filter
+        self.batch_size = batch_size
+        self.batched_model = None
         self.model = None
-        self.executor = ThreadPoolExecutor(max_workers=1)
+        if not FASTER_WHISPER_AVAILABLE:
+            num_workers = 1  # openai-whisper models are not safe to call concurrently
+        elif num_workers is None:
+            num_workers = max(1, min(4, (os.cpu_count() or 1) // 4))
+        self.num_workers = num_workers
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // num_workers)
+        self.executor = ThreadPoolExecutor(max_workers=num_workers)
         self.chunk_duration = 300  # 5 minutes per chunk
     
-    async def transcribe(self, audio_path: str, job_id: str) -> List[Segment]:
+    async def transcribe(self, audio: AudioInput, job_id: str) -> List[Segment]:
         """
         Transcribe an audio file and save results to job folder.
         
         Args:
-            audio_path: Path to the audio file
+            audio: Path to the audio file, or 16kHz mono float32 samples
             job_id: Job ID for saving results
             
         Returns:
             List of Segment objects
         """
+        return [segment async for segment in self.transcribe_stream(audio, job_id)]
+    
+    async def transcribe_stream(self, audio: AudioInput, job_id: str) -> AsyncIterator[Segment]:
+        """
+        Transcribe an audio file, yielding segments as soon as each chunk is done.
+        
+        Long files are transcribed chunk by chunk, so consumers can start working
+        on early segments while later chunks are still being decoded. Results are
+        saved to the job folder once the whole file has been transcribed.
+        
+        Args:
+            audio: Path to the audio file, or 16kHz mono float32 samples
+            job_id: Job ID for saving results
+            
+        Yields:
+            Segment objects in timeline order
+        """
         try:
-            # Convert to 16kHz WAV if needed
-            wav_path = await self._ensure_16k_wav(audio_path)
+            # Decode files once into memory; chunks are then array slices
+            source = audio if isinstance(audio, np.ndarray) else await self._decode_audio(audio)
             
             # Load model if not already loaded
             if self.model is None:
                 await self._load_model()
             
             # Check if file needs chunking
-            duration = await self._get_audio_duration(wav_path)
+            duration = len(source) / SAMPLE_RATE
             logger.info(f"Audio duration: {duration:.2f} seconds")
             
+            segments = []
             if duration > self.chunk_duration:
-                segments = await self._transcribe_chunked(wav_path)
+                async for chunk_segments in self._transcribe_chunked(source, duration):
+                    segments.extend(chunk_segments)
+                    for segment in chunk_segments:
+                        yield segment
             else:
-                segments = await self._transcribe_single(wav_path)
+                segments = await self._transcribe_single(source)
+                for segment in segments:
+                    yield segment
             
             # Save results to job folder
             await self._save_results(segments, job_id)
             
             logger.info(f"Transcription completed: {len(segments)} segments")
-            return segments
             
         except Exception as e:
             logger.error(f"Transcription failed: {str(e)}")
             raise
-        finally:
-            # Clean up temporary WAV file if it was created
-            if 'wav_path' in locals() and wav_path != audio_path:
-                try:
-                    os.unlink(wav_path)
-                except OSError:
-                    pass
     
     async def _load_model(self):
         """Load the Whisper model with timeout."""
@@ -116,92 +188,131 @@ class TranscriptionService:
             raise RuntimeError("Model loading timed out - try a smaller model")
     
     def _load_model_sync(self):
-        """Synchronous model loading."""
-        logger.info(f"Loading Whisper model: {self.model_size}")
-        
+        """Synchronous model loading, reusing a cached model when one matches."""
         if FASTER_WHISPER_AVAILABLE:
-            self.model = WhisperModel(
-                self.model_size,
-                device=self.device,
-                compute_type="float16" if self.device == "cuda" else "int8"
-            )
+            device = self._resolve_device()
+            compute_type = self.compute_type or self._default_compute_type(device)
+            if self.model_size is None:
+                # Turbo matches medium-level accuracy at a fraction of the decode cost on GPU
+                self.model_size = MODEL_ALIASES["turbo"] if device == "cuda" else "tiny"
+            key = (self.model_size, device, compute_type, self.num_workers, self.cpu_threads)
         else:
-            self.model = whisper.load_model(self.model_size)
+            self.model_size = self.model_size or "tiny"
+            key = (self.model_size, "openai-whisper")
+        if self.beam_size is None:
+            self.beam_size = 1 if self.model_size in GREEDY_MODEL_SIZES else 5
+        
+        # Hold the lock while loading so concurrent jobs wait for one load
+        # instead of each loading their own copy
+        with _model_cache_lock:
+            model = _model_cache.get(key)
+            if model is None:
+                logger.info(f"Loading Whisper model: {self.model_size}")
+                if FASTER_WHISPER_AVAILABLE:
+                    logger.info(f"Whisper device: {device}, compute type: {compute_type}")
+                    model = WhisperModel(
+                        self.model_size,
+                        device=device,
+                        compute_type=compute_type,
+                        cpu_threads=self.cpu_threads,
+                        num_workers=self.num_workers  # lets concurrent transcribe() calls run in parallel
+                    )
+                else:
+                    model = whisper.load_model(self.model_size)
+                _model_cache[key] = model
+            else:
+                logger.debug(f"Reusing loaded Whisper model: {self.model_size}")
+        self.model = model
+        
+        # The batched pipeline is a thin wrapper, so it is created per instance. It
+        # needs VAD (or clip timestamps) to split audio longer than 30s into windows
+        if (FASTER_WHISPER_AVAILABLE and BATCHED_INFERENCE_AVAILABLE
+                and self.batch_size > 1 and self.vad_filter):
+            self.batched_model = BatchedInferencePipeline(model=model)
     
-    async def _ensure_16k_wav(self, audio_path: str) -> str:
-        """Convert audio to 16kHz WAV format."""
-        # Check if already 16kHz WAV
-        if audio_path.lower().endswith('.wav'):
-            # Check sample rate
+    def _resolve_device(self) -> str:
+        """Turn "auto" into a concrete device so the compute type can match it."""
+        if self.device != "auto":
+            return self.device
+        try:
+            return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        except Exception:
+            return "cpu"
+    
+    def _default_compute_type(self, device: str) -> str:
+        """
+        Pick the fastest compute type for the device.
+        
+        int8 is a real speedup on CPU, but on GPUs weight dequantization usually
+        makes it slower than float16, so GPUs use float16 whenever supported.
+        """
+        if device == "cuda":
             try:
-                process = await asyncio.create_subprocess_exec(
-                    'ffprobe', '-v', 'quiet', '-show_entries', 'stream=sample_rate',
-                    '-of', 'csv=p=0', audio_path,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await process.communicate()
-                if process.returncode != 0:
-                    raise subprocess.CalledProcessError(process.returncode, 'ffprobe')
-                result = type('Result', (), {'stdout': stdout.decode()})()
-                
-                sample_rate = int(result.stdout.strip())
-                if sample_rate == 16000:
-                    return audio_path
-            except (subprocess.CalledProcessError, ValueError):
+                if "float16" in ctranslate2.get_supported_compute_types("cuda"):
+                    return "float16"
+            except Exception:
                 pass
+        return "int8"
+    
+    async def _decode_audio(self, audio_path: str) -> np.ndarray:
+        """
+        Decode an audio or video file to 16kHz mono float32 samples.
+        
+        FFmpeg writes raw PCM to a pipe, so there is no intermediate WAV file
+        to write and read back, and no separate ffprobe call for the duration.
+        WAV files that are already 16kHz mono 16-bit are read directly.
+        """
+        if audio_path.lower().endswith('.wav'):
+            loop = asyncio.get_event_loop()
+            audio = await loop.run_in_executor(None, self._read_16k_mono_wav, audio_path)
+            if audio is not None:
+                logger.info(f"Read 16kHz mono WAV directly: {len(audio)} samples")
+                return audio
         
-        # Convert to 16kHz WAV
-        wav_path = _create_temp_file('.wav')
+        cmd = [
+            'ffmpeg', '-i', audio_path,
+            '-map', '0:a:0',  # First audio stream only
+            '-vn',
+            '-f', 's16le',    # Raw 16-bit samples, no container
+            '-ar', str(SAMPLE_RATE),
+            '-ac', '1',       # Mono
+            'pipe:1'
+        ]
         
         try:
-            cmd = [
-                'ffmpeg', '-i', audio_path,
-                '-ar', '16000',  # 16kHz sample rate
-                '-ac', '1',      # Mono
-                '-y',            # Overwrite output
-                wav_path
-            ]
-            
             process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
             stdout, stderr = await process.communicate()
             if process.returncode != 0:
-                raise subprocess.CalledProcessError(process.returncode, 'ffmpeg', stderr.decode())
-            logger.info(f"Converted audio to 16kHz WAV: {wav_path}")
-            return wav_path
+                raise subprocess.CalledProcessError(process.returncode, 'ffmpeg', stderr=stderr.decode(errors="replace"))
+            audio = np.frombuffer(stdout, dtype=np.int16).astype(np.float32) / 32768.0
+            logger.info(f"Decoded audio to {len(audio)} samples at {SAMPLE_RATE}Hz")
+            return audio
             
         except subprocess.CalledProcessError as e:
-            logger.error(f"Audio conversion failed: {e.stderr}")
+            logger.error(f"Audio decoding failed: {e.stderr}")
             raise
     
-    async def _get_audio_duration(self, audio_path: str) -> float:
-        """Get audio duration in seconds."""
+    def _read_16k_mono_wav(self, audio_path: str) -> Optional[np.ndarray]:
+        """Read a 16kHz mono 16-bit PCM WAV from its header, or None if it needs converting."""
         try:
-            process = await asyncio.create_subprocess_exec(
-                'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-                '-of', 'csv=p=0', audio_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            if process.returncode != 0:
-                raise subprocess.CalledProcessError(process.returncode, 'ffprobe', stderr.decode())
-            
-            return float(stdout.decode().strip())
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to get audio duration: {e.stderr}")
-            return 0.0
+            with wave.open(audio_path, 'rb') as wav:
+                if (wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1
+                        or wav.getsampwidth() != 2 or wav.getcomptype() != 'NONE'):
+                    return None
+                pcm = wav.readframes(wav.getnframes())
+        except (wave.Error, EOFError, OSError):
+            return None
+        return np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
     
-    async def _transcribe_single(self, audio_path: str) -> List[Segment]:
-        """Transcribe a single audio file with timeout."""
+    async def _transcribe_single(self, audio: AudioInput) -> List[Segment]:
+        """Transcribe a single audio file (or sample array) with timeout."""
         loop = asyncio.get_event_loop()
         try:
             return await asyncio.wait_for(
                 loop.run_in_executor(
                     self.executor,
                     self._transcribe_single_sync,
-                    audio_path
+                    audio
                 ),
                 timeout=600  # 10 minute timeout for transcription
             )
@@ -209,16 +320,26 @@ class TranscriptionService:
             logger.error("Transcription timed out")
             raise RuntimeError("Transcription timed out - audio file may be too long or corrupted")
     
-    def _transcribe_single_sync(self, audio_path: str) -> List[Segment]:
+    def _transcribe_single_sync(self, audio: AudioInput) -> List[Segment]:
         """Synchronous single file transcription."""
         try:
             if FASTER_WHISPER_AVAILABLE:
                 # Use faster-whisper
-                segments, _ = self.model.transcribe(
-                    audio_path,
-                    beam_size=5,
-                    word_timestamps=True
-                )
+                options = {
+                    "beam_size": self.beam_size,
+                    "word_timestamps": self.word_timestamps,
+                    "vad_filter": self.vad_filter,
+                    "vad_parameters": {"min_silence_duration_ms": 500},
+                }
+                if self.batched_model is not None:
+                    # Encode the chunk's 30-second windows in batches instead of one by one.
+                    # Timestamp tokens keep sentence-level segments; without them each
+                    # VAD-merged window would come back as one coarse 30s segment
+                    segments, _ = self.batched_model.transcribe(
+                        audio, batch_size=self.batch_size, without_timestamps=False, **options
+                    )
+                else:
+                    segments, _ = self.model.transcribe(audio, **options)
                 
                 result_segments = []
                 for segment in segments:
@@ -232,8 +353,9 @@ class TranscriptionService:
             else:
                 # Use original whisper
                 result = self.model.transcribe(
-                    audio_path,
-                    word_timestamps=True,
+                    audio,
+                    beam_size=self.beam_size if self.beam_size > 1 else None,
+                    word_timestamps=self.word_timestamps,
                     verbose=False
                 )
                 
@@ -251,15 +373,21 @@ class TranscriptionService:
             logger.error(f"Single transcription failed: {str(e)}")
             raise
     
-    async def _transcribe_chunked(self, audio_path: str) -> List[Segment]:
-        """Transcribe a long audio file by chunking."""
-        duration = await self._get_audio_duration(audio_path)
-        num_chunks = int(duration / self.chunk_duration) + 1
+    async def _transcribe_chunked(self, audio: np.ndarray, duration: float) -> AsyncIterator[List[Segment]]:
+        """
+        Transcribe a long audio file by chunking, yielding each chunk's segments.
         
-        logger.info(f"Audio duration: {duration:.1f}s - processing in {num_chunks} chunks of {self.chunk_duration}s each")
+        Up to num_workers chunks are transcribed at once, but results are yielded
+        in timeline order so segments stay sorted for consumers.
+        """
+        num_chunks = int(duration / self.chunk_duration) + 1
         
-        all_segments = []
+        logger.info(f"Audio duration: {duration:.1f}s - processing in {num_chunks} chunks of {self.chunk_duration}s each "
+                    f"({self.num_workers} in parallel)")
         
+        # Bound in-flight chunks so each one's timeout only covers its own decode
+        semaphore = asyncio.Semaphore(self.num_workers)
+        tasks = []
         for i in range(num_chunks):
             start_time = i * self.chunk_duration
             end_time = min((i + 1) * self.chunk_duration, duration)
@@ -267,59 +395,36 @@ class TranscriptionService:
             if start_time >= duration:
                 break
             
-            logger.debug(f"Processing chunk {i+1}/{num_chunks}: {start_time:.1f}s - {end_time:.1f}s")
-            
-            # Extract chunk
-            chunk_path = await self._extract_chunk(audio_path, start_time, end_time)
-            
-            try:
-                # Transcribe chunk
-                chunk_segments = await self._transcribe_single(chunk_path)
-                
-                # Adjust timestamps to global time
-                for segment in chunk_segments:
-                    segment.start += start_time
-                    segment.end += start_time
-                
-                all_segments.extend(chunk_segments)
-                logger.debug(f"Chunk {i+1} completed: {len(chunk_segments)} segments")
-                
-            finally:
-                # Clean up chunk file
-                try:
-                    os.unlink(chunk_path)
-                except OSError:
-                    pass
-        
-        # Sort segments by start time
-        all_segments.sort(key=lambda x: x.start)
-        
-        return all_segments
-    
-    async def _extract_chunk(self, audio_path: str, start_time: float, end_time: float) -> str:
-        """Extract a time chunk from audio file."""
-        chunk_path = _create_temp_file('.wav')
+            tasks.append(asyncio.create_task(
+                self._transcribe_chunk(audio, start_time, end_time, semaphore)
+            ))
         
         try:
-            cmd = [
-                'ffmpeg', '-i', audio_path,
-                '-ss', str(start_time),
-                '-t', str(end_time - start_time),
-                '-ar', '16000',
-                '-ac', '1',
-                '-y',
-                chunk_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-            _, stderr = await process.communicate()
-            if process.returncode != 0:
-                raise subprocess.CalledProcessError(process.returncode, 'ffmpeg', stderr.decode())
-            return chunk_path
+            for i, task in enumerate(tasks):
+                chunk_segments = await task
+                logger.debug(f"Chunk {i+1}/{len(tasks)} completed: {len(chunk_segments)} segments")
+                yield chunk_segments
+        finally:
+            # Stop outstanding chunks if the consumer bails out or a chunk failed
+            for task in tasks:
+                task.cancel()
+    
+    async def _transcribe_chunk(self, audio: np.ndarray, start_time: float, end_time: float,
+                                semaphore: asyncio.Semaphore) -> List[Segment]:
+        """Transcribe one time range of the audio, with timestamps shifted to global time."""
+        async with semaphore:
+            logger.debug(f"Processing chunk: {start_time:.1f}s - {end_time:.1f}s")
             
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Chunk extraction failed: {e.stderr}")
-            raise
+            # Slice the in-memory samples - a view, no temp file or ffmpeg process
+            chunk_audio = audio[int(start_time * SAMPLE_RATE):int(end_time * SAMPLE_RATE)]
+            chunk_segments = await self._transcribe_single(chunk_audio)
+        
+        # Adjust timestamps to global time
+        for segment in chunk_segments:
+            segment.start += start_time
+            segment.end += start_time
+        
+        return chunk_segments
     
     async def _save_results(self, segments: List[Segment], job_id: str):
         """Save transcription results to job folder."""
@@ -333,8 +438,8 @@ class TranscriptionService:
             "total_duration": max([seg.end for seg in segments]) if segments else 0.0
         }
         
-        async with aiofiles.open(job_dir / "transcript.json", "w") as f:
-            await f.write(json.dumps(transcript_data, indent=2))
+        async with aiofiles.open(job_dir / "transcript.json", "wb") as f:
+            await f.write(orjson.dumps(transcript_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
         
         # Save transcript.srt
         await self._save_srt(segments, job_dir / "transcript.srt")
@@ -343,21 +448,24 @@ class TranscriptionService:
     
     async def _save_srt(self, segments: List[Segment], srt_path: Path):
         """Save segments as SRT subtitle file."""
+        # Build the whole file in memory so it goes out in one write instead of
+        # one executor round-trip per line
+        fmt = self._format_srt_time
+        payload = "".join([
+            f"{i}\n{fmt(segment.start)} --> {fmt(segment.end)}\n{segment.text}\n\n"
+            for i, segment in enumerate(segments, 1)
+        ])
         async with aiofiles.open(srt_path, "w", encoding="utf-8") as f:
-            for i, segment in enumerate(segments, 1):
-                start_time = self._format_srt_time(segment.start)
-                end_time = self._format_srt_time(segment.end)
-                
-                await f.write(f"{i}\n")
-                await f.write(f"{start_time} --> {end_time}\n")
-                await f.write(f"{segment.text}\n\n")
+            await f.write(payload)
     
     def _format_srt_time(self, seconds: float) -> str:
         """Format seconds to SRT time format (HH:MM:SS,mmm)."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
+        # Round to whole milliseconds once, then split with integer divmod; float
+        # modulo truncation turned e.g. 1.001 into 1,000
+        total_millis = int(seconds * 1000 + 0.5)
+        total_secs, millis = divmod(total_millis, 1000)
+        total_minutes, secs = divmod(total_secs, 60)
+        hours, minutes = divmod(total_minutes, 60)
         
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
     
@@ -14,114 +14,117 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent / "backend"))
 
 from backend.database import get_db, create_tables
-from backend.services import UserService, JobService
-from backend.schemas import UserCreate, JobCreate, JobStatus
-from backend.models import UserCreate as UserCreateModel, JobCreate as JobCreateModel
+from backend.schemas import User, Job, JobStatus
+from backend.auth import hash_password
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import random
 
+@dataclass(frozen=True, slots=True)
+class SeedUser:
+    """A sample account created by the seed script."""
+    email: str
+    password: str
+    full_name: str
+
+@dataclass(frozen=True, slots=True)
+class SeedJob:
+    """A sample job; ``age`` is subtracted from the seeding time to get ``created_at``."""
+    title: str
+    target_seconds: int
+    status: JobStatus
+    age: timedelta
+
+SEED_USERS: tuple[SeedUser, ...] = (
+    SeedUser("demo@example.com", "demo123", "Demo User"),
+    SeedUser("john@example.com", "john123", "John Doe"),
+    SeedUser("jane@example.com", "jane123", "Jane Smith"),
+    SeedUser("admin@example.com", "admin123", "Admin User"),
+)
+
+SEED_JOBS: tuple[SeedJob, ...] = (
+    SeedJob("Product Launch Presentation", 60, JobStatus.COMPLETED, timedelta(days=1)),
+    SeedJob("Team Meeting Recording", 120, JobStatus.PROCESSING, timedelta(hours=2)),
+    SeedJob("Conference Talk Highlights", 180, JobStatus.COMPLETED, timedelta(days=3)),
+    SeedJob("Training Video Summary", 90, JobStatus.FAILED, timedelta(hours=6)),
+    SeedJob("Interview Highlights", 150, JobStatus.COMPLETED, timedelta(days=2)),
+)
+
 def create_sample_users(db: Session) -> list:
-    """Create sample users for testing."""
-    users = []
+    """Create sample users for testing (inserted in the session's transaction, committed by main)."""
+    # Skip accounts left over from a previous run instead of failing on the unique email
+    emails = [seed_user.email for seed_user in SEED_USERS]
+    existing = {email for (email,) in db.query(User.email).filter(User.email.in_(emails))}
+    for email in existing:
+        print(f"⏭️  User already exists: {email}")
     
-    sample_users = [
-        {
-            "email": "demo@example.com",
-            "password": "demo123",
-            "full_name": "Demo User"
-        },
-        {
-            "email": "john@example.com", 
-            "password": "john123",
-            "full_name": "John Doe"
-        },
-        {
-            "email": "jane@example.com",
-            "password": "jane123", 
-            "full_name": "Jane Smith"
-        },
+    new_users = [seed_user for seed_user in SEED_USERS if seed_user.email not in existing]
+    if not new_users:
+        return []
+    
+    # bcrypt releases the GIL, so hashing in threads scales with cores
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        hashed_passwords = list(executor.map(hash_password, (seed_user.password for seed_user in new_users)))
+    
+    # One executemany INSERT through Core - no identity map or unit of work
+    db.execute(insert(User.__table__), [
         {
-            "email": "admin@example.com",
-            "password": "admin123",
-            "full_name": "Admin User"
+            "email": seed_user.email,
+            "hashed_password": hashed_password,
+            "full_name": seed_user.full_name
         }
-    ]
+        for seed_user, hashed_password in zip(new_users, hashed_passwords)
+    ])
     
-    for user_data in sample_users:
-        try:
-            user = UserService.create_user(db, UserCreateModel(**user_data))
-            users.append(user)
-            print(f"✅ Created user: {user.email}")
-        except Exception as e:
-            print(f"❌ Failed to create user {user_data['email']}: {e}")
+    # Read back the generated IDs the sample jobs need (portable, unlike RETURNING)
+    users = db.execute(
+        select(User.id, User.email)
+        .where(User.email.in_([seed_user.email for seed_user in new_users]))
+        .order_by(User.id)
+    ).all()
+    for user in users:
+        print(f"✅ Created user: {user.email}")
     
     return users
 
 def create_sample_jobs(db: Session, users: list) -> list:
-    """Create sample jobs for testing."""
-    jobs = []
+    """Create sample jobs for testing (inserted in the session's transaction, committed by main)."""
+    if not users:
+        return []
     
-    sample_jobs = [
-        {
-            "title": "Product Launch Presentation",
-            "target_seconds": 60,
-            "status": JobStatus.COMPLETED,
-            "created_at": datetime.now() - timedelta(days=1)
-        },
-        {
-            "title": "Team Meeting Recording", 
-            "target_seconds": 120,
-            "status": JobStatus.PROCESSING,
-            "created_at": datetime.now() - timedelta(hours=2)
-        },
-        {
-            "title": "Conference Talk Highlights",
-            "target_seconds": 180,
-            "status": JobStatus.COMPLETED,
-            "created_at": datetime.now() - timedelta(days=3)
-        },
-        {
-            "title": "Training Video Summary",
-            "target_seconds": 90,
-            "status": JobStatus.FAILED,
-            "created_at": datetime.now() - timedelta(hours=6)
-        },
-        {
-            "title": "Interview Highlights",
-            "target_seconds": 150,
-            "status": JobStatus.COMPLETED,
-            "created_at": datetime.now() - timedelta(days=2)
+    # Fixed seed so every run produces the same sample metadata
+    rng = random.Random(42)
+    
+    now = datetime.now()
+    jobs = []
+    for i, seed_job in enumerate(SEED_JOBS):
+        # Assign jobs to different users
+        user = users[i % len(users)]
+        job = {
+            "user_id": user.id,
+            "title": seed_job.title,
+            "target_seconds": seed_job.target_seconds,
+            "original_filename": f"sample_video_{i+1}.mp4",
+            "status": seed_job.status,
+            "created_at": now - seed_job.age,
+            # executemany needs the same keys in every row
+            "summary_duration": None,
+            "compression_ratio": None
         }
-    ]
+        
+        # Add some metadata for completed jobs
+        if seed_job.status == JobStatus.COMPLETED:
+            job["summary_duration"] = rng.randint(45, 200)
+            job["compression_ratio"] = str(round(rng.uniform(0.3, 0.8), 2))
+        
+        jobs.append(job)
     
-    for i, job_data in enumerate(sample_jobs):
-        try:
-            # Assign jobs to different users
-            user = users[i % len(users)]
-            
-            job = JobService.create_job(
-                db, 
-                user.id, 
-                JobCreateModel(title=job_data["title"], target_seconds=job_data["target_seconds"]),
-                f"sample_video_{i+1}.mp4"
-            )
-            
-            # Update job status and creation time
-            job.status = job_data["status"]
-            job.created_at = job_data["created_at"]
-            
-            # Add some metadata for completed jobs
-            if job_data["status"] == JobStatus.COMPLETED:
-                job.duration_seconds = random.randint(45, 200)
-                job.compression_ratio = round(random.uniform(0.3, 0.8), 2)
-            
-            db.commit()
-            jobs.append(job)
-            print(f"✅ Created job: {job.title} for {user.email}")
-            
-        except Exception as e:
-            print(f"❌ Failed to create job {job_data['title']}: {e}")
+    db.execute(insert(Job.__table__), jobs)
+    for i, job in enumerate(jobs):
+        print(f"✅ Created job: {job['title']} for {users[i % len(users)].email}")
     
     return jobs
 
@@ -145,6 +148,9 @@ def main():
         print("\n📹 Creating sample jobs...")
         jobs = create_sample_jobs(db, users)
         
+        # Everything lands in a single transaction, so a failure leaves no partial seed
+        db.commit()
+        
         print(f"\n🎉 Seeding completed!")
         print(f"   - Created {len(users)} users")
         print(f"   - Created {len(jobs)} jobs")